@@ -0,0 +1,237 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+
+# Замеры без окна: SDL рисует в память (dummy), поэтому бенчмарк одинаково
+# запускается на машине разработчика и в CI. Все случайное - с фиксированным зерном,
+# так что два запуска на одной версии измеряют одну и ту же работу.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+
+from game_types.state import (FreeCells, SnakeState, GameState, ItemState, ObstacleState, ITEM_TYPES,
+                               Timers, max_obstacles)
+from game_types.highscores import HighscoreStore, BackgroundWriter
+
+SEED = 12345
+
+
+def measure(func, repeat=5, number=1):
+    """Запускает func() number раз подряд repeat серий; секунды на вызов (медиана и лучшая серия)"""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        runs.append((time.perf_counter() - start) / number)
+    return {'median_s': statistics.median(runs), 'min_s': min(runs), 'repeat': repeat, 'number': number}
+
+
+def serpentine(width, height, length):
+    """Клетки змейкой по строкам (слева направо, потом обратно); голова - последняя клетка"""
+    cells = []
+    for y in range(height):
+        row = range(width) if y % 2 == 0 else range(width - 1, -1, -1)
+        for x in row:
+            cells.append((x, y))
+            if len(cells) == length:
+                return cells
+    return cells
+
+
+def staircase(width, height, length):
+    """Лесенка: каждый сегмент - поворот (худший случай для выбора текстур)"""
+    cells = []
+    x = y = 0
+    while len(cells) < length:
+        cells.append((x % width, y % height))
+        if len(cells) % 2:
+            x += 1
+        else:
+            y += 1
+    return cells
+
+
+def set_body(snake, path):
+    """Заменяет тело змейки: path от хвоста к голове, занятость поля пересчитывается"""
+    for segment in snake.body:
+        snake._release(segment)
+    snake.body = deque(reversed(path))
+    for segment in snake.body:
+        snake._occupy(segment)
+    if len(path) > 1:
+        (hx, hy), (nx, ny) = path[-1], path[-2]
+        snake.direction = snake.next_direction = (hx - nx, hy - ny)
+
+
+def bench_update(game_class, lengths, ticks):
+    """Тиков в секунду: змейка двигается каждый тик, неуязвима, поэтому партия не кончается"""
+    results = {}
+    for length in lengths:
+        game = game_class(1920, 1080, seed=SEED)
+        set_body(game.snake, serpentine(game.grid_width, game.grid_height, length))
+        until = game.effect_until
+
+        def run():
+            for _ in range(ticks):
+                # Звезда сократила бы неуязвимость до своих 300 тиков - продлеваем каждый тик
+                until['invincible'] = 10 ** 9
+                game.tick(1)
+
+        timing = measure(run)
+        timing['ticks_per_s'] = ticks / timing['median_s']
+        timing['final_length'] = len(game.snake.body)
+        results[str(length)] = timing
+    return results
+
+
+def bench_snake_draw(screen, length):
+    """Snake.draw() лесенкой из length сегментов (каждый сегмент - поворот)"""
+    from game_types.index import Snake
+    snake = Snake(20)
+    set_body(snake, staircase(screen.get_width() // snake.grid_size, screen.get_height() // snake.grid_size, length))
+    results = {}
+    for name, alpha in (('static', 1.0), ('interpolated', 0.5)):
+        snake.last_tail = snake.body[-1]
+        timing = measure(lambda: snake.draw(screen, alpha), number=20)
+        timing['segments'] = length
+        results[name] = timing
+    return results
+
+
+def bench_spawn(free_counts, spawns):
+    """Задержка спавна предмета, когда свободны только free клеток поля"""
+    results = {}
+    for free in free_counts:
+        board = FreeCells(rng=random.Random(SEED))
+        set_body(SnakeState(board), serpentine(board.width, board.height, board.width * board.height - free))
+        item = ItemState(ITEM_TYPES['food'], board, {}, Timers())
+
+        def run():
+            for _ in range(spawns):
+                item.spawn()
+
+        timing = measure(run)
+        timing['us_per_spawn'] = timing['median_s'] / spawns * 1e6
+        results[str(free)] = timing
+    return results
+
+
+def bench_obstacles(sizes):
+    """generate_obstacles() с максимальным числом камней для поля (с проверкой связности)"""
+    results = {}
+    for width, height in sizes:
+        state = GameState(width, height, seed=SEED)
+        count = max_obstacles(width, height)
+        obstacles = ObstacleState(width, height, count, state.board)
+        obstacles.generate_obstacles(state.snake)  # Прогрев кэша масок поля
+        timing = measure(lambda: obstacles.generate_obstacles(state.snake), number=20)
+        timing['count'] = count
+        timing['placed'] = len(obstacles.positions)
+        results[f'{width}x{height}'] = timing
+    return results
+
+
+def _fake_records(count):
+    rng = random.Random(SEED)
+    return [{'id': i, 'name': f'Player{rng.randrange(1000)}', 'score': rng.randrange(10000),
+             'level': rng.randrange(1, 20), 'date': '2025-01-01 12:00'} for i in range(count)]
+
+
+def bench_highscores(counts):
+    """Загрузка снимка рекордов, добавление записи (с fsync журнала) и перезапись снимка"""
+    results = {}
+    for count in counts:
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'highscores.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(_fake_records(count), f, indent=2)
+            writer = BackgroundWriter(threaded=False)  # Замеряем саму запись, а не постановку в очередь
+            stores = []
+
+            def load():
+                store = HighscoreStore(path, compact_every=10 ** 9, writer=writer)
+                store.load()
+                stores.append(store)
+
+            result = {'file_bytes': os.path.getsize(path), 'load': measure(load, repeat=3)}
+            store = stores[-1]
+            result['add'] = measure(lambda: store.add(5000, 3, 'Bench'), repeat=3, number=20)
+            result['compact'] = measure(store.compact, repeat=3)
+            results[str(count)] = result
+    return results
+
+
+def _version():
+    """Коммит дерева, если бенчмарк запущен из git-репозитория"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Snake Game benchmarks (JSON)')
+    parser.add_argument('--out', metavar='FILE', help='записать JSON в файл (по умолчанию - stdout)')
+    parser.add_argument('--quick', action='store_true', help='уменьшенные размеры для быстрой проверки')
+    parser.add_argument('--only', action='append', metavar='NAME',
+                        help='запустить только этот бенчмарк (update, snake_draw, spawn, obstacles, highscores)')
+    return parser.parse_args(argv)
+
+
+def run(args):
+    pygame.init()
+    screen = pygame.display.set_mode((1920, 1080))
+    from game_types.index import Game
+
+    quick = args.quick
+    benchmarks = {
+        'update': lambda: bench_update(Game, (10, 100, 1000), 600 if quick else 6000),
+        'snake_draw': lambda: bench_snake_draw(screen, 1000),
+        'spawn': lambda: bench_spawn((100, 10, 1), 1000 if quick else 10000),
+        'obstacles': lambda: bench_obstacles(((48, 27), (96, 54)) if quick else ((48, 27), (96, 54), (192, 108))),
+        'highscores': lambda: bench_highscores((1000, 10000) if quick else (1000, 10000, 100000)),
+    }
+    results = {}
+    for name, bench in benchmarks.items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = bench()
+    pygame.quit()
+    return {
+        'version': _version(),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'quick': quick,
+        'results': results,
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Сообщения игры (загрузка текстур, рекордов) - в stderr, чтобы stdout оставался чистым JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+
+# Сборка атласа текстур (запускать после изменения PNG в assets):
+#   python src/build_atlas.py
+# Создает змейку, предметы и камни для каждого размера клетки так же, как игра,
+# и складывает все получившиеся варианты (размеры, повороты, отражения, углы змейки)
+# в assets/atlas.png, а их прямоугольники - в assets/atlas.json.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+
+from game_types.assets import ATLAS_NAME, ATLAS_VERSION, textures
+from game_types.state import FreeCells, Timers, ITEM_TYPES
+
+GRID_SIZES = (20, 10, 5)  # base_grid_size игры для --cell 40/20/10 (клетка на экране вдвое больше)
+ATLAS_WIDTH = 1024
+
+
+def collect_variants(grid_sizes):
+    """Все варианты текстур, которые создают игровые объекты, ключ -> поверхность"""
+    from game_types.index import Snake, Item, Obstacle
+    textures.atlas = None  # Собираем из исходных PNG, а не из старого атласа
+    textures.clear()
+    for grid_size in grid_sizes:
+        Snake(grid_size)
+        for kind in ITEM_TYPES.values():
+            Item(kind, FreeCells(), {}, Timers(), grid_size=grid_size)
+        Obstacle(grid_size)
+    return {key: surface for key, surface in textures.variants.items() if surface is not None}
+
+
+def pack(sizes, width):
+    """Раскладка полками: высокие спрайты первыми; ключ -> (x, y), и высота атласа"""
+    order = sorted(sizes, key=lambda key: (-sizes[key][1], -sizes[key][0], repr(key)))
+    positions = {}
+    x = y = shelf = 0
+    for key in order:
+        w, h = sizes[key]
+        if x + w > width:
+            x, y = 0, y + shelf
+            shelf = 0
+        positions[key] = (x, y)
+        x += w
+        shelf = max(shelf, h)
+    return positions, y + shelf
+
+
+def build(grid_sizes=GRID_SIZES, width=ATLAS_WIDTH):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    variants = collect_variants(grid_sizes)
+    sizes = {key: surface.get_size() for key, surface in variants.items()}
+    width = max(width, max(w for w, _ in sizes.values()))
+    positions, height = pack(sizes, width)
+
+    sheet = pygame.Surface((width, height), pygame.SRCALPHA)
+    sheet.fill((0, 0, 0, 0))
+    sprites = []
+    for key, surface in variants.items():
+        x, y = positions[key]
+        # MAX по всем каналам поверх пустого листа - точная копия пикселей с альфой
+        sheet.blit(surface, (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+        sprites.append([key, [x, y, *sizes[key]]])
+    sprites.sort(key=lambda sprite: sprite[1][1::-1])  # По строкам: индекс удобно читать и сравнивать
+
+    image_path = os.path.join(textures.assets_path, ATLAS_NAME + '.png')
+    index_path = os.path.join(textures.assets_path, ATLAS_NAME + '.json')
+    pygame.image.save(sheet, image_path)
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': ATLAS_VERSION, 'grid_sizes': list(grid_sizes), 'sprites': sprites},
+                  f, separators=(',', ':'))
+    pygame.quit()
+    print(f"🧩 Атлас {width}x{height}: {len(sprites)} спрайтов -> {image_path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Собрать атлас текстур Snake Game')
+    parser.add_argument('--grid-size', type=int, action='append', dest='grid_sizes',
+                        help=f'base_grid_size, для которого нужны варианты (по умолчанию {GRID_SIZES})')
+    parser.add_argument('--width', type=int, default=ATLAS_WIDTH, help='ширина атласа в пикселях')
+    args = parser.parse_args(argv)
+    build(tuple(args.grid_sizes or GRID_SIZES), args.width)
+
+
+if __name__ == "__main__":
+    main()
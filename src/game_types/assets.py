@@ -0,0 +1,208 @@
+import json
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+
+# Получаем абсолютный путь к папке проекта
+def get_project_root():
+    """Возвращает корневую папку проекта"""
+    if getattr(sys, 'frozen', False):
+        # Если запущен как exe
+        return os.path.dirname(sys.executable)
+    else:
+        # Если запущен как скрипт - поднимаемся на 2 уровня вверх от assets.py
+        current_file = os.path.abspath(__file__)  # .../game_types/assets.py
+        src_dir = os.path.dirname(os.path.dirname(current_file))  # .../src
+        project_root = os.path.dirname(src_dir)  # .../snake-game
+        return project_root
+
+PROJECT_ROOT = get_project_root()
+ASSETS_PATH = os.path.join(PROJECT_ROOT, 'assets')
+
+# Атлас: все готовые варианты текстур одной картинкой + индекс прямоугольников.
+# Собирается заранее скриптом src/build_atlas.py (пересобрать после изменения PNG)
+ATLAS_NAME = 'atlas'
+ATLAS_VERSION = 1
+
+
+def _atlas_key(value):
+    """Ключ варианта из JSON обратно в кортеж (списки -> кортежи на всех уровнях)"""
+    if isinstance(value, list):
+        return tuple(_atlas_key(item) for item in value)
+    return value
+
+
+class TextureCache:
+    """Общий на весь процесс кэш текстур.
+
+    Каждый PNG читается с диска один раз, а каждый вариант (размер, поворот, отражение)
+    создается один раз и раздается всем объектам. Поэтому Game.reset() не трогает диск
+    и память не растет от рестартов.
+
+    preload() читает и декодирует PNG в пуле потоков, пока главный поток поднимает окно;
+    get() ждет только свой файл. convert_alpha() всегда делается в главном потоке.
+
+    Если в assets есть атлас (atlas.png + atlas.json), все его варианты - подповерхности
+    одной картинки: одно чтение файла и ни одного transform во время игры. Варианты,
+    которых в атласе нет (другой размер клетки), по-прежнему строятся из отдельных PNG.
+    """
+    def __init__(self, assets_path=ASSETS_PATH, atlas=ATLAS_NAME):
+        self.assets_path = assets_path
+        self.atlas = atlas  # Имя атласа без расширения; None - не использовать
+        self.images = {}  # Имя файла -> исходное изображение
+        self.variants = {}  # (имя, размер, поворот, отражение) -> готовая поверхность
+        self.pending = {}  # Имя файла -> Future с декодированным изображением
+        self.atlas_index = None  # Ключ варианта -> (x, y, w, h); None - индекс еще не читали
+        self.atlas_unpacked = False
+
+    def _atlas_index(self):
+        if self.atlas_index is None:
+            self.atlas_index = {}
+            if self.atlas is not None:
+                try:
+                    with open(os.path.join(self.assets_path, self.atlas + '.json'), 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    if data.get('version') == ATLAS_VERSION:
+                        self.atlas_index = {_atlas_key(key): tuple(rect) for key, rect in data['sprites']}
+                except FileNotFoundError:
+                    pass  # Атлас не собран - работаем с отдельными PNG
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    print(f"⚠️ Атлас текстур поврежден, загружаю отдельные PNG: {e}")
+        return self.atlas_index
+
+    def _unpack_atlas(self):
+        """Раскладывает атлас на подповерхности (один раз); True, если варианты добавились"""
+        if self.atlas_unpacked or not self._atlas_index():
+            return False
+        self.atlas_unpacked = True
+        try:
+            sheet = self._image(self.atlas + '.png')
+        except Exception as e:
+            print(f"⚠️ Не удалось загрузить атлас текстур: {e}")
+            return False
+        for key, rect in self.atlas_index.items():
+            self.variants.setdefault(key, sheet.subsurface(rect))
+        return True
+
+    def preload(self, names=None, workers=4):
+        """Начинает загрузку PNG (по умолчанию атласа или всех файлов из assets) в фоновых потоках"""
+        if names is None:
+            if self._atlas_index():
+                names = [self.atlas + '.png']
+            else:
+                skip = {f'{ATLAS_NAME}.png', f'{self.atlas}.png'}  # Сам атлас - не текстура
+                try:
+                    names = sorted(name for name in os.listdir(self.assets_path)
+                                   if name.lower().endswith('.png') and name not in skip)
+                except OSError:
+                    return  # Нет папки - ошибки покажет get() у конкретной текстуры
+        names = [name for name in names if name not in self.images and name not in self.pending]
+        if not names:
+            return
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='asset-loader')
+        for name in names:
+            self.pending[name] = pool.submit(pygame.image.load, os.path.join(self.assets_path, name))
+        pool.shutdown(wait=False)  # Потоки завершатся сами, когда очередь опустеет
+
+    def wait(self):
+        """Дожидается всех начатых загрузок (ошибки отложены до get() этой текстуры)"""
+        for name in list(self.pending):
+            try:
+                self._image(name)
+            except Exception:
+                pass
+
+    def _image(self, name):
+        image = self.images.get(name)
+        if image is None:
+            future = self.pending.pop(name, None)
+            if future is not None:
+                image = future.result()  # Ошибка чтения из потока поднимется здесь
+            else:
+                image = pygame.image.load(os.path.join(self.assets_path, name))
+            # convert_alpha() возможен только после set_mode(); ускоряет blit в разы
+            if pygame.display.get_init() and pygame.display.get_surface() is not None:
+                image = image.convert_alpha()
+            self.images[name] = image
+        return image
+
+    def get(self, name, size=None, rotation=0, flip=False):
+        """Текстура, отмасштабированная до size, отраженная по горизонтали и повернутая на rotation градусов"""
+        key = (name, size, rotation, flip)
+        surface = self.variants.get(key)
+        if surface is None and self._unpack_atlas():
+            surface = self.variants.get(key)
+        if surface is None:
+            surface = self._image(name)
+            if size is not None:
+                surface = pygame.transform.scale(surface, size)
+            if flip:
+                surface = pygame.transform.flip(surface, True, False)
+            if rotation:
+                surface = pygame.transform.rotate(surface, rotation)
+            self.variants[key] = surface
+        return surface
+
+    def derived(self, key, build):
+        """Вариант, который строит вызывающий (повороты змейки): из кэша/атласа или build()"""
+        surface = self.variants.get(key)
+        if surface is None and self._unpack_atlas():
+            surface = self.variants.get(key)
+        if surface is None:
+            surface = self.variants[key] = build()
+        return surface
+
+    def clear(self):
+        self.images.clear()
+        self.variants.clear()
+        self.pending.clear()
+        self.atlas_index = None
+        self.atlas_unpacked = False
+
+
+textures = TextureCache()
+
+
+class TextCache:
+    """Общие шрифты и кэш отрендеренных надписей.
+
+    font.render() - медленная операция (растеризация глифов), а HUD и меню рисуют
+    одни и те же строки каждый кадр. Готовая поверхность хранится по ключу
+    (шрифт, текст, цвет), поэтому заново рендерится только изменившийся текст.
+    Самые давно не использованные надписи вытесняются (LRU), чтобы меняющиеся
+    значения (очки, таймеры) не копились бесконечно.
+    """
+    def __init__(self, max_size=512):
+        self.max_size = max_size
+        self.fonts = {}  # (имя файла, размер) -> pygame.font.Font
+        self.surfaces = OrderedDict()  # (шрифт, текст, цвет, сглаживание) -> поверхность
+
+    def font(self, size, name=None):
+        """Один экземпляр шрифта на (имя, размер) на весь процесс"""
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.Font(name, size)
+        return font
+
+    def render(self, font, text, color, antialias=True):
+        """Как font.render(), но из кэша. Возвращаемую поверхность нельзя изменять"""
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.fonts.clear()
+        self.surfaces.clear()
+
+
+texts = TextCache()
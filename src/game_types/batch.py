@@ -0,0 +1,404 @@
+import numpy as np
+from .state import GRID_WIDTH, GRID_HEIGHT, ITEM_TYPES, ObstacleState, max_obstacles, _RING
+
+# Пакетная симуляция: N независимых партий шагают одновременно, всё состояние - массивы NumPy.
+# Правила повторяют GameState.tick()/update()/check_level_up(); случайные числа свои (np.random),
+# поэтому партии не совпадают с GameState покадрово, но статистически эквивалентны.
+
+# Направления: 0 - вправо, 1 - вниз, 2 - влево, 3 - вверх (противоположное = (d + 2) % 4)
+RIGHT, DOWN, LEFT, UP = range(4)
+DIRECTIONS = np.array([(1, 0), (0, 1), (-1, 0), (0, -1)], dtype=np.int64)
+
+# Эффект предмета -> счетчик партии и знак (ускорение - отрицательный slowdown_timer)
+EFFECT_TIMERS = {
+    'boost': ('slowdown_timer', -1),
+    'slowdown': ('slowdown_timer', 1),
+    'invincible': ('invincible_timer', 1),
+    'reverse': ('reverse_control_timer', 1),
+    'freeze': ('freeze_timer', 1),
+}
+EFFECT_NAMES = tuple(EFFECT_TIMERS)
+
+# Предметы: слот на каждый экземпляр (ItemType.count) в порядке ITEM_TYPES. Правила подбора -
+# столбцы по слотам из той же таблицы, что читает GameState.pick_up(): новая строка в
+# ITEM_TYPES сразу работает и здесь.
+ITEM_SLOTS = [kind for kind in ITEM_TYPES.values() for _ in range(kind.count)]
+ITEM_COUNT = len(ITEM_SLOTS)
+
+
+def _column(value, dtype=np.int64):
+    return np.array([value(kind) for kind in ITEM_SLOTS], dtype=dtype)
+
+
+POINTS_MIN = _column(lambda kind: kind.points[0] if isinstance(kind.points, tuple) else kind.points)
+POINTS_MAX = _column(lambda kind: kind.points[1] if isinstance(kind.points, tuple) else kind.points)
+LIFETIMES = _column(lambda kind: kind.lifetime or 0)  # 0 - без таймера (лежит, пока не съедят)
+GROWTH = _column(lambda kind: kind.growth)
+MULTIPLY = _column(lambda kind: kind.multiply, bool)
+COMBO = _column(lambda kind: kind.combo, bool)
+LEVEL_UP = _column(lambda kind: kind.level_up, bool)
+EFFECTS = _column(lambda kind: EFFECT_NAMES.index(kind.effect[0]) if kind.effect else -1)  # -1 - без эффекта
+EFFECT_TICKS = _column(lambda kind: kind.effect[1] if kind.effect else 0)
+
+
+class BatchGame:
+    """N партий змейки в массивах NumPy.
+
+    Тело каждой змейки - кольцевой буфер номеров клеток (y * width + x), занятость поля -
+    счетчики сегментов в клетке, камни - булева сетка. Столкновения и подбор предметов
+    проверяются сразу для всех партий; по партиям идет только цикл генерации камней.
+    """
+    def __init__(self, n, grid_width=GRID_WIDTH, grid_height=GRID_HEIGHT, seed=None):
+        self.n = n
+        self.width = grid_width
+        self.height = grid_height
+        self.cells = grid_width * grid_height
+        self.capacity = 2 * self.cells  # Под неуязвимостью змейка может перекрываться и стать длиннее поля
+        self.rng = np.random.default_rng(seed)
+
+        self.body = np.zeros((n, self.capacity), dtype=np.int64)
+        self.head = np.zeros(n, dtype=np.int64)  # Индекс головы в кольцевом буфере
+        self.length = np.zeros(n, dtype=np.int64)
+        self.occupied = np.zeros((n, self.cells), dtype=np.int16)
+        self.rocks = np.zeros((n, self.cells), dtype=bool)
+        self.items = np.full((n, ITEM_COUNT), -1, dtype=np.int64)  # Клетка предмета, -1 - негде появиться
+        self.item_timer = np.zeros((n, ITEM_COUNT), dtype=np.int64)
+        self.item_points = np.zeros((n, ITEM_COUNT), dtype=np.int64)  # Очки, разыгранные при появлении
+
+        self.direction = np.zeros(n, dtype=np.int64)
+        self.next_direction = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.level = np.ones(n, dtype=np.int64)
+        self.combo_counter = np.zeros(n, dtype=np.int64)
+        self.last_pickup_was_bonus = np.zeros(n, dtype=bool)
+        self.slowdown_timer = np.zeros(n, dtype=np.int64)
+        self.invincible_timer = np.zeros(n, dtype=np.int64)
+        self.reverse_control_timer = np.zeros(n, dtype=np.int64)
+        self.freeze_timer = np.zeros(n, dtype=np.int64)
+        self.move_counter = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.ticks = np.zeros(n, dtype=np.int64)  # Прожитые тики каждой партии
+
+        self.reset()
+
+    # ---- Состояние ----
+
+    def reset(self, mask=None):
+        """Начинает заново все партии или только отмеченные в mask"""
+        rows = np.arange(self.n) if mask is None else np.flatnonzero(mask)
+        if rows.size == 0:
+            return
+        self.occupied[rows] = 0
+        self.rocks[rows] = False
+        self.items[rows] = -1
+        self.item_timer[rows] = 0
+
+        # Змейка (10, 10), (9, 10), (8, 10) головой вправо
+        start = [8 + 10 * self.width, 9 + 10 * self.width, 10 + 10 * self.width]
+        self.body[rows, :3] = start
+        self.head[rows] = 2
+        self.length[rows] = 3
+        self.occupied[rows[:, None], start] = 1
+        self.direction[rows] = RIGHT
+        self.next_direction[rows] = RIGHT
+
+        for name in ('score', 'combo_counter', 'slowdown_timer', 'invincible_timer',
+                     'reverse_control_timer', 'freeze_timer', 'move_counter', 'ticks'):
+            getattr(self, name)[rows] = 0
+        self.level[rows] = 1
+        self.last_pickup_was_bonus[rows] = False
+        self.game_over[rows] = False
+
+        for slot in range(ITEM_COUNT):
+            self._spawn(rows, slot)
+        self._generate_rocks(rows, np.full(rows.size, 5))
+
+    def head_cells(self):
+        """Номер клетки головы каждой партии"""
+        return self.body[np.arange(self.n), self.head]
+
+    def head_positions(self):
+        """Координаты голов: массивы x и y"""
+        cells = self.head_cells()
+        return cells % self.width, cells // self.width
+
+    # ---- Управление и шаг ----
+
+    def steer(self, actions):
+        """Поворот для каждой партии: 0..3 - направление, -1 - без изменений (реверс от гриба учитывается)"""
+        actions = np.asarray(actions, dtype=np.int64)
+        wanted = (actions >= 0) & ~self.game_over
+        direction = np.where(self.reverse_control_timer > 0, (actions + 2) % 4, actions)
+        # Как Snake.set_direction(): нельзя развернуться назад относительно текущего направления
+        allowed = wanted & (direction != (self.direction + 2) % 4)
+        self.next_direction[allowed] = direction[allowed]
+
+    def step(self, actions=None, ticks=1, base_move_interval=10):
+        """Поворот (если задан) и ticks тиков симуляции"""
+        if actions is not None:
+            self.steer(actions)
+        for _ in range(ticks):
+            self.tick(base_move_interval)
+
+    def tick(self, base_move_interval=10):
+        """Один тик всех партий - как GameState.tick()"""
+        active = ~self.game_over
+        self.ticks[active] += 1
+
+        # Ускорение от яблока / замедление от паука
+        move_interval = np.full(self.n, base_move_interval, dtype=np.int64)
+        boost = active & (self.slowdown_timer < 0)
+        move_interval[boost] = max(2, base_move_interval - 5)
+        self.slowdown_timer[boost] += 1
+        slow = active & (self.slowdown_timer > 0)
+        move_interval[slow] = min(20, base_move_interval + 5)
+        self.slowdown_timer[slow] -= 1
+
+        self.move_counter[active] += 1
+        due = active & (self.move_counter >= move_interval)
+        self.move_counter[due] = 0
+        self._move(np.flatnonzero(due & (self.freeze_timer == 0)))
+
+        rows = np.flatnonzero(active & ~self.game_over)
+        if rows.size:
+            self._update(rows)
+
+    # ---- Внутренности ----
+
+    def _move(self, rows):
+        if rows.size == 0:
+            return
+        direction = self.next_direction[rows]
+        self.direction[rows] = direction
+        head = self.body[rows, self.head[rows]]
+        x = head % self.width + DIRECTIONS[direction, 0]
+        y = head // self.width + DIRECTIONS[direction, 1]
+
+        # После 5 уровня стены: выход за край - Game Over, иначе обёртывание
+        outside = (x < 0) | (x >= self.width) | (y < 0) | (y >= self.height)
+        crashed = outside & (self.level[rows] > 5)
+        self.game_over[rows[crashed]] = True
+        keep = ~crashed
+        rows = rows[keep]
+        cells = (y[keep] % self.height) * self.width + x[keep] % self.width
+
+        tail = self.body[rows, (self.head[rows] - self.length[rows] + 1) % self.capacity]
+        self.occupied[rows, tail] -= 1
+        self.head[rows] = (self.head[rows] + 1) % self.capacity
+        self.body[rows, self.head[rows]] = cells
+        self.occupied[rows, cells] += 1
+
+    def _grow(self, rows):
+        rows = rows[self.length[rows] < self.capacity - 1]
+        tail = self.body[rows, (self.head[rows] - self.length[rows] + 1) % self.capacity]
+        self.body[rows, (self.head[rows] - self.length[rows]) % self.capacity] = tail
+        self.length[rows] += 1
+        self.occupied[rows, tail] += 1
+
+    def _shrink(self, rows):
+        rows = rows[self.length[rows] > 3]
+        tail = self.body[rows, (self.head[rows] - self.length[rows] + 1) % self.capacity]
+        self.occupied[rows, tail] -= 1
+        self.length[rows] -= 1
+
+    def _free_cells(self, rows, skip_item=None):
+        """Свободные клетки (M, cells): без змейки, камней и предметов"""
+        free = (self.occupied[rows] == 0) & ~self.rocks[rows]
+        items = self.items[rows]
+        if skip_item is not None:
+            items = np.delete(items, skip_item, axis=1)
+        placed = items >= 0
+        free[np.nonzero(placed)[0], items[placed]] = False
+        return free
+
+    def _sample(self, free):
+        """Равномерно случайная True-клетка в каждой строке, -1 если таких нет"""
+        counts = free.sum(axis=1)
+        target = (self.rng.random(free.shape[0]) * counts).astype(np.int64)
+        cells = np.argmax(np.cumsum(free, axis=1) > target[:, None], axis=1)
+        cells[counts == 0] = -1
+        return cells
+
+    def _spawn(self, rows, slot):
+        if rows.size == 0:
+            return
+        cells = self._sample(self._free_cells(rows, skip_item=slot))
+        self.items[rows, slot] = cells
+        if POINTS_MIN[slot] != POINTS_MAX[slot]:
+            placed = rows[cells >= 0]
+            self.item_points[placed, slot] = self.rng.integers(POINTS_MIN[slot], POINTS_MAX[slot] + 1, size=placed.size)
+        else:
+            self.item_points[rows, slot] = POINTS_MIN[slot]
+        self.item_timer[rows, slot] = LIFETIMES[slot]
+
+    def _path_ahead(self, rows, wrap):
+        """Клетки перед головой на safe_distance шагов по направлению движения (M, h, w)"""
+        w, h = self.width, self.height
+        head = self.body[rows, self.head[rows]]
+        x, y = head % w, head // w
+        dx, dy = DIRECTIONS[self.direction[rows], 0], DIRECTIONS[self.direction[rows], 1]
+        path = np.zeros((rows.size, h, w), dtype=bool)
+        index = np.arange(rows.size)
+        for _ in range(ObstacleState.safe_distance):
+            x, y = x + dx, y + dy
+            x = np.where(wrap, x % w, x)
+            y = np.where(wrap, y % h, y)
+            # Без сквозных краев путь кончается у стены (дальше по прямой тоже за краем)
+            inside = (x >= 0) & (x < w) & (y >= 0) & (y < h)
+            path[index[inside], y[inside], x[inside]] = True
+        return path
+
+    def _reachable(self, rows, wrap):
+        """Клетки без камней, достижимые от головы (M, h, w): заливка сразу во всех партиях"""
+        w = self.width
+        open_cells = ~self.rocks[rows].reshape(rows.size, -1, w)
+        head = self.body[rows, self.head[rows]]
+        reach = np.zeros_like(open_cells)
+        reach[np.arange(rows.size), head // w, head % w] = True
+        reach &= open_cells
+        wrap = wrap[:, None]
+        while True:
+            grown = reach.copy()
+            grown[:, :, 1:] |= reach[:, :, :-1]
+            grown[:, :, :-1] |= reach[:, :, 1:]
+            grown[:, 1:] |= reach[:, :-1]
+            grown[:, :-1] |= reach[:, 1:]
+            grown[:, :, 0] |= reach[:, :, -1] & wrap
+            grown[:, :, -1] |= reach[:, :, 0] & wrap
+            grown[:, 0] |= reach[:, -1] & wrap
+            grown[:, -1] |= reach[:, 0] & wrap
+            grown &= open_cells
+            if np.array_equal(grown, reach):
+                return reach
+            reach = grown
+
+    def _splits_field(self, rows, anchors, wrap):
+        """Разделил ли поставленный камень с якорем anchors[i] поле партии rows[i] (как в ObstacleState)"""
+        w = self.width
+        # Свободные клетки кольца вокруг камня одним куском - путь через камень можно обойти
+        ring = ~self.rocks[rows[:, None], anchors[:, None] + np.array([dy * w + dx for dx, dy in _RING])]
+        runs = (ring & ~np.roll(ring, 1, axis=1)).sum(axis=1)
+        split = np.zeros(rows.size, dtype=bool)
+        check = np.flatnonzero(runs > 1)
+        if check.size:
+            reach = self._reachable(rows[check], wrap[check]).reshape(check.size, -1)
+            split[check] = (reach != ~self.rocks[rows[check]]).any(axis=1)
+        return split
+
+    def _generate_rocks(self, rows, counts):
+        """Камни 2х2 по правилам ObstacleState.generate_obstacles(): не на строках змейки,
+        не на змейке и предметах, не друг на друге, не ближе safe_distance клеток перед головой
+        и без отрезанных от головы частей поля. Якорь выбирается равномерно среди допустимых."""
+        if rows.size == 0:
+            return
+        w, h = self.width, self.height
+        self.rocks[rows] = False
+        wrap = self.level[rows] <= 5  # С 6 уровня края - стены
+        head_y = self.body[rows, self.head[rows]] // w
+        ys = np.arange(h)
+        # Запрещенные строки якоря: строка змейки, одна сверху и две снизу
+        allowed = np.zeros((rows.size, h, w), dtype=bool)
+        allowed[:, 2:h - 3, 2:w - 3] = True  # randint(2, width - 4) включительно
+        allowed &= (np.abs(ys[None, :] - (head_y[:, None] + 0.5)) > 2)[:, :, None]
+        # Никаких камней прямо по курсу: якоря, чей камень накрыл бы клетку пути
+        path = self._path_ahead(rows, wrap)
+        covered = path.copy()
+        covered[:, :, :-1] |= path[:, :, 1:]
+        covered[:, :-1] |= path[:, 1:]
+        covered[:, :-1, :-1] |= path[:, 1:, 1:]
+        allowed &= ~covered
+
+        placed = np.zeros(rows.size, dtype=np.int64)
+        done = placed >= counts
+        while not done.all():
+            index = np.flatnonzero(~done)
+            sub = rows[index]
+            free = self._free_cells(sub).reshape(-1, h, w)
+            anchors = np.zeros_like(free)
+            anchors[:, :-1, :-1] = free[:, :-1, :-1] & free[:, :-1, 1:] & free[:, 1:, :-1] & free[:, 1:, 1:]
+            anchors &= allowed[index]
+            cells = self._sample(anchors.reshape(sub.size, -1))
+            done[index[cells < 0]] = True  # Места для камней больше нет
+            keep = cells >= 0
+            index, sub, cells = index[keep], sub[keep], cells[keep]
+            for offset in (0, 1, w, w + 1):
+                self.rocks[sub, cells + offset] = True
+            # Якорь, отрезавший часть поля, убираем и больше его этой партии не предлагаем
+            split = self._splits_field(sub, cells, wrap[index])
+            for offset in (0, 1, w, w + 1):
+                self.rocks[sub[split], cells[split] + offset] = False
+            allowed.reshape(rows.size, -1)[index[split], cells[split]] = False
+            placed[index[~split]] += 1
+            done |= placed >= counts
+
+    def _check_level_up(self, rows):
+        new_level = self.score[rows] // 250 + 1
+        up = new_level > self.level[rows]
+        rows = rows[up]
+        if rows.size == 0:
+            return
+        self.level[rows] = new_level[up]
+        self._generate_rocks(rows, np.minimum(5 + self.level[rows], max_obstacles(self.width, self.height)))
+
+    def _chain(self, rows):
+        chained = self.last_pickup_was_bonus[rows]
+        self.combo_counter[rows] = np.where(chained, self.combo_counter[rows] + 1, 1)
+        self.last_pickup_was_bonus[rows] = True
+
+    def _break_combo(self, rows):
+        self.combo_counter[rows] = 0
+        self.last_pickup_was_bonus[rows] = False
+
+    def _update(self, rows):
+        """Как GameState.update() для партий rows"""
+        # Таймеры предметов: истекшие переспавниваются, предмет без таймера ждет свободную клетку
+        timers = self.item_timer[rows]
+        timers -= timers > 0
+        self.item_timer[rows] = timers
+        expired = np.where(LIFETIMES > 0, timers == 0, self.items[rows] < 0)
+        for slot in range(ITEM_COUNT):
+            self._spawn(rows[expired[:, slot]], slot)
+
+        # Таймеры эффектов
+        for timer in (self.invincible_timer, self.reverse_control_timer, self.freeze_timer):
+            timer[rows] -= timer[rows] > 0
+
+        # Столкновения с собой и камнями (если нет неуязвимости)
+        head = self.body[rows, self.head[rows]]
+        vulnerable = self.invincible_timer[rows] == 0
+        crashed = vulnerable & ((self.occupied[rows, head] > 1) | self.rocks[rows, head])
+        self.game_over[rows[crashed]] = True
+        rows, head = rows[~crashed], head[~crashed]
+
+        # Подбор: в клетке не больше одного предмета, у каждой партии - не больше одного слота
+        on_head = self.items[rows] == head[:, None]
+        hit = on_head.any(axis=1)
+        rows, slots = rows[hit], on_head[hit].argmax(axis=1)
+        if rows.size:
+            self._pick_up(rows, slots)
+
+    def _pick_up(self, rows, slots):
+        """Как GameState.pick_up(): партия rows[i] съела предмет слота slots[i]"""
+        growth = GROWTH[slots]
+        self._grow(rows[growth > 0])
+        self._shrink(rows[growth < 0])
+
+        points = self.item_points[rows, slots]
+        multiplied = MULTIPLY[slots] & self.last_pickup_was_bonus[rows]
+        points = np.where(multiplied, points * (1 + self.combo_counter[rows]), points)
+        self.score[rows] = np.maximum(0, self.score[rows] + points)
+
+        effects = EFFECTS[slots]
+        for index, name in enumerate(EFFECT_NAMES):
+            chosen = effects == index
+            if chosen.any():
+                attribute, sign = EFFECT_TIMERS[name]
+                getattr(self, attribute)[rows[chosen]] = sign * EFFECT_TICKS[slots[chosen]]
+
+        for slot in range(ITEM_COUNT):
+            self._spawn(rows[slots == slot], slot)
+
+        combo = COMBO[slots]
+        self._chain(rows[combo])
+        self._break_combo(rows[~combo])
+        self._check_level_up(rows[LEVEL_UP[slots]])
@@ -0,0 +1,46 @@
+import time
+
+# Все таймеры и скорости в правилах заданы в тиках симуляции по 1/60 секунды
+SIM_HZ = 60
+
+
+class FixedStepClock:
+    """Часы с фиксированным шагом симуляции.
+
+    Реальное время копится в аккумуляторе и расходуется целыми тиками по 1/SIM_HZ,
+    поэтому скорость игры не зависит от частоты кадров: на 144 Гц тиков меньше, чем
+    кадров, а медленный кадр догоняется несколькими тиками. alpha - доля следующего
+    тика, уже прошедшая к моменту отрисовки (для интерполяции).
+    """
+    def __init__(self, hz=SIM_HZ, max_steps=8, time_func=time.perf_counter):
+        self.dt = 1.0 / hz
+        self.max_steps = max_steps  # Не догоняем больше, чем за столько тиков (иначе игра "проматывается")
+        self.time_func = time_func
+        self.accumulator = 0.0
+        self.last = None
+
+    def reset(self):
+        """Забыть накопленное время (после меню и других блокирующих экранов)"""
+        self.accumulator = 0.0
+        self.last = None
+
+    def steps(self):
+        """Сколько тиков симуляции нужно выполнить в этом кадре"""
+        now = self.time_func()
+        if self.last is None:
+            self.last = now - self.dt  # Первый кадр - один тик
+        self.accumulator += now - self.last
+        self.last = now
+        count = int(self.accumulator / self.dt)
+        if count > self.max_steps:
+            # Слишком сильно отстали - отбрасываем лишнее время вместо рывка вперед
+            count = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= count * self.dt
+        return count
+
+    @property
+    def alpha(self):
+        """Доля тика между последним состоянием и следующим (0..1)"""
+        return min(1.0, self.accumulator / self.dt)
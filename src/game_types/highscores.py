@@ -0,0 +1,298 @@
+import atexit
+import json
+import os
+import queue
+import threading
+from bisect import bisect_right
+from datetime import datetime
+
+# Таблица рекордов хранится целиком (вся история, а не только топ-10):
+#   highscores.json - снимок: JSON-список записей, отсортированный по убыванию очков
+#   highscores.log  - новые записи после снимка, по одной JSON-строке на запись
+# Новый рекорд дописывается одной строкой в журнал, а когда журнал вырастает до
+# compact_every записей, снимок переписывается атомарно (временный файл + os.replace)
+# и журнал очищается. У каждой записи есть возрастающий id, поэтому если программа
+# упадет между заменой снимка и очисткой журнала, записи при загрузке не задвоятся.
+#
+# Сам диск трогает только фоновый поток (BackgroundWriter): игровой цикл кладет задачу
+# в очередь и сразу продолжает рисовать, даже если домашняя папка на медленном
+# сетевом диске. Перед выходом очередь дописывается до конца (atexit).
+
+
+def _fsync_dir(path):
+    """fsync папки, чтобы переименование файла тоже пережило сбой питания (не везде возможно)"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return  # Windows не умеет открывать папки
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def append_file(path, text):
+    """Дописывает строку в файл и дожидается записи на диск.
+
+    Если файл обрывается на недописанной строке (сбой во время прошлой записи),
+    новая строка начинается с перевода строки: иначе она склеилась бы с обрывком
+    и при загрузке пропала бы вместе с ним.
+    """
+    data = text.encode('utf-8')
+    with open(path, 'a+b') as f:
+        end = f.seek(0, os.SEEK_END)
+        if end:
+            f.seek(end - 1)
+            if f.read(1) != b'\n':
+                data = b'\n' + data
+        f.write(data)  # В режиме 'a' запись всегда идет в конец файла
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def atomic_write(path, data):
+    """Записывает файл целиком: временный файл + fsync + os.replace (старый или новый, но не половина)"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+
+
+class BackgroundWriter:
+    """Поток, который по очереди выполняет задачи записи на диск.
+
+    Очередь ограничена: если диск совсем не успевает, submit() подождет освобождения
+    места, а не будет копить задачи в памяти бесконечно.
+    """
+    def __init__(self, max_pending=64, threaded=True):
+        self.threaded = threaded
+        self.jobs = queue.Queue(max_pending)
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def _start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='highscore-writer', daemon=True)
+                self.thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                if job is None:
+                    return
+                self._execute(*job)
+            finally:
+                self.jobs.task_done()
+
+    @staticmethod
+    def _execute(func, args):
+        try:
+            func(*args)
+        except Exception as e:
+            print(f"❌ Ошибка сохранения: {e}")
+
+    def submit(self, func, *args):
+        """Ставит func(*args) в очередь и сразу возвращается"""
+        if not self.threaded:
+            self._execute(func, args)
+            return
+        if self.thread is None:
+            self._start()
+        self.jobs.put((func, args))
+
+    def flush(self):
+        """Ждет, пока все поставленные задачи будут записаны"""
+        if self.thread is not None:
+            self.jobs.join()
+
+    def close(self):
+        """Дописывает очередь и останавливает поток (вызывается и автоматически при выходе)"""
+        with self.lock:
+            thread, self.thread = self.thread, None
+        if thread is not None:
+            self.jobs.put(None)
+            thread.join()
+
+
+def _rank_key(record):
+    """Порядок в таблице: больше очков выше, при равенстве - кто раньше"""
+    return (-record['score'], record['id'])
+
+
+class _SortedRecords:
+    """Записи, отсортированные по _rank_key; вставка бинарным поиском"""
+    def __init__(self):
+        self.keys = []
+        self.records = []
+
+    def insert(self, record):
+        key = _rank_key(record)
+        i = bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.records.insert(i, record)
+        return i
+
+    def top(self, n=None):
+        return self.records[:n] if n is not None else list(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+
+class HighscoreStore:
+    """Таблица рекордов: загружается с диска один раз, дальше все запросы - из памяти"""
+    def __init__(self, path, compact_every=100, writer=None):
+        self.path = path
+        self.log_path = os.path.splitext(path)[0] + '.log'
+        self.compact_every = compact_every
+        self.writer = writer if writer is not None else BackgroundWriter()
+        self.loaded = False
+        self.load_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.ranking = _SortedRecords()  # Все записи
+        self.levels = {}  # Уровень -> _SortedRecords
+        self.best = {}  # Имя игрока -> его лучшая запись
+        self.next_id = 0
+        self.log_size = 0
+
+    def _index(self, record):
+        rank = self.ranking.insert(record)
+        level = self.levels.get(record['level'])
+        if level is None:
+            level = self.levels[record['level']] = _SortedRecords()
+        level.insert(record)
+        name = record.get('name', 'Player')
+        best = self.best.get(name)
+        if best is None or _rank_key(record) < _rank_key(best):
+            self.best[name] = record
+        self.next_id = max(self.next_id, record['id'] + 1)
+        return rank
+
+    def _build(self, records):
+        """Индексы по всем записям сразу: одна сортировка вместо вставки по одной"""
+        records.sort(key=_rank_key)
+        for record in records:
+            # Записи идут от лучшей к худшей - вставка в конец без поиска
+            key = _rank_key(record)
+            self.ranking.keys.append(key)
+            self.ranking.records.append(record)
+            level = self.levels.get(record['level'])
+            if level is None:
+                level = self.levels[record['level']] = _SortedRecords()
+            level.keys.append(key)
+            level.records.append(record)
+            self.best.setdefault(record.get('name', 'Player'), record)
+            self.next_id = max(self.next_id, record['id'] + 1)
+
+    def load(self):
+        """Читает снимок и журнал (один раз; повторные вызовы ничего не делают)"""
+        if self.loaded:
+            return self
+        with self.load_lock:
+            if not self.loaded:
+                self._load()
+                self.loaded = True
+        return self
+
+    def preload(self):
+        """Начинает загрузку в фоне, чтобы экран рекордов потом не ждал диск"""
+        threading.Thread(target=self.load, name='highscore-loader', daemon=True).start()
+
+    def _load(self):
+        self._reset()
+        records = []
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    records = json.load(f)
+                for i, record in enumerate(records):
+                    # В старых файлах нет id - нумеруем в порядке файла
+                    record.setdefault('id', i)
+            else:
+                print(f"⚠️ Файл рекордов не найден: {self.path}")
+        except Exception as e:
+            print(f"❌ Ошибка загрузки рекордов: {e}")
+        next_id = max((record['id'] + 1 for record in records), default=0)
+        if os.path.exists(self.log_path):
+            try:
+                with open(self.log_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # Недописанная строка после сбоя
+                        if record.get('id', -1) < next_id:
+                            continue  # Уже есть в снимке (сбой во время сжатия)
+                        records.append(record)
+                        next_id = record['id'] + 1
+                        self.log_size += 1
+            except Exception as e:
+                print(f"❌ Ошибка чтения журнала рекордов: {e}")
+        self._build(records)
+        print(f"📖 Загружено {len(self.ranking)} рекордов из файла")
+
+    def add(self, score, level, name="Player", **extra):
+        """Добавляет результат в таблицу и дописывает его в журнал. Возвращает место (с 1)"""
+        self.load()
+        record = {
+            'id': self.next_id,
+            'name': name,
+            'score': score,
+            'level': level,
+            'date': datetime.now().strftime('%Y-%m-%d %H:%M'),
+        }
+        record.update(extra)
+        rank = self._index(record)
+        self.writer.submit(append_file, self.log_path, json.dumps(record, ensure_ascii=False) + '\n')
+        self.log_size += 1
+        if self.log_size >= self.compact_every:
+            self.compact()
+        return rank + 1
+
+    def compact(self):
+        """Переписывает снимок всеми записями и очищает журнал (в фоновом потоке)"""
+        self.load()
+        # Записи после создания не меняются - потоку достаточно копии списка
+        self.writer.submit(self._write_snapshot, list(self.ranking.records))
+        self.log_size = 0
+
+    def _write_snapshot(self, records):
+        atomic_write(self.path, json.dumps(records, indent=2, ensure_ascii=False))
+        # Задачи выполняются по порядку: все строки журнала до этой уже вошли в снимок
+        atomic_write(self.log_path, '')
+
+    def flush(self):
+        """Дожидается записи всех рекордов на диск"""
+        self.writer.flush()
+
+    def top(self, n=10):
+        """Лучшие n результатов за всю историю"""
+        return self.load().ranking.top(n)
+
+    def player_best(self, name):
+        """Лучший результат игрока или None"""
+        return self.load().best.get(name)
+
+    def players(self, n=10):
+        """Лучшие n игроков (по одной, лучшей, записи на игрока)"""
+        return sorted(self.load().best.values(), key=_rank_key)[:n]
+
+    def level_top(self, level, n=10):
+        """Лучшие n результатов, закончившихся на уровне level"""
+        records = self.load().levels.get(level)
+        return records.top(n) if records is not None else []
+
+    def __len__(self):
+        return len(self.load().ranking)
@@ -0,0 +1,235 @@
+import random
+
+import pygame
+
+try:
+    import numpy as np
+    import pygame.surfarray  # Сам модуль грузится лениво - при первом кадре это заметно
+except ImportError:  # Без NumPy текстуры рисуются pygame.draw (медленнее; раскладка та же)
+    np = None
+
+# Процедурные текстуры: фон "вспаханное поле" и стены по периметру.
+#
+# С NumPy пиксели пишутся прямо в поверхность через surfarray: полосы и шахматка -
+# срезами и масками, точки грязи и камни - разом по всем пикселям всех кругов.
+# Всё случайное берется из генератора с зерном, поэтому одно и то же (зерно, размер)
+# дает одну и ту же картинку, и она строится один раз на процесс: рестарт и новый
+# уровень берут готовые поверхности. Без NumPy раскладка (полосы, точки, камни, трещины)
+# та же, но круги и травинки растеризуются pygame.draw, так что края могут отличаться
+# на отдельные пиксели. На диск не кэшируем - чтение 8 МБ пикселей
+# дольше, чем сама генерация (~2.5 мс на 1920x1080).
+
+FIELD_SEED = 1
+WALL_SEED = 17
+
+DARK_BROWN = (101, 67, 33)
+LIGHT_BROWN = (139, 90, 43)
+GRASS_COLOR = (34, 139, 34)
+WALL_BASE = (105, 105, 120)
+WALL_ALT = (130, 130, 150)
+WALL_CRACK = (70, 70, 85)
+WALL_STONE = (90, 90, 105)
+
+_surfaces = {}  # (имя, зерно, размер поля) -> поверхности, общие для всех Game
+
+
+def _screen():
+    return pygame.display.get_surface() if pygame.display.get_init() else None
+
+
+def new_surface(size):
+    """32-битная поверхность, по возможности сразу в формате экрана (тогда convert() не нужен)"""
+    screen = _screen()
+    if screen is not None and screen.get_bitsize() == 32:
+        return pygame.Surface(size, 0, screen)
+    return pygame.Surface(size, 0, 32)
+
+
+def cached_surfaces(name, seed, size, build):
+    """Поверхности из кэша процесса или build() (рисует по зерну и размеру поля)"""
+    key = (name, seed, size)
+    surfaces = _surfaces.get(key)
+    if surfaces is None:
+        surfaces = build()
+        screen = _screen()
+        if screen is not None:
+            surfaces = [surface if surface.get_masks() == screen.get_masks() else surface.convert()
+                        for surface in surfaces]
+        surfaces = _surfaces[key] = tuple(surfaces)
+    return surfaces
+
+
+# ---- NumPy ----
+# Рисуем прямо в пиксели 32-битной поверхности (surfarray.pixels2d, без копий):
+# сплошную заливку делает SDL, а NumPy - полосы срезами и все круги разом.
+
+def _map_colors(surface, colors):
+    """Массив цветов (n, 3) -> значения пикселей поверхности (как map_rgb, но для всех сразу)"""
+    colors = np.asarray(colors, np.uint32).reshape(-1, 3)
+    r_shift, g_shift, b_shift, _ = surface.get_shifts()
+    alpha = surface.get_masks()[3]
+    return (colors[:, 0] << r_shift) | (colors[:, 1] << g_shift) | (colors[:, 2] << b_shift) | alpha
+
+
+def _disk_offsets(radius):
+    """Смещения (dx, dy) пикселей круга радиуса radius"""
+    d = np.arange(-radius, radius + 1)
+    dx, dy = np.meshgrid(d, d, indexing='ij')
+    inside = dx * dx + dy * dy <= radius * radius
+    return dx[inside], dy[inside]
+
+
+def _stamp_circles(pixels, xs, ys, radii, values):
+    """Закрашенные круги в массиве пикселей (w, h): все круги одного радиуса за одну операцию"""
+    width, height = pixels.shape
+    for radius in sorted(set(radii.tolist())):  # np.unique при первом вызове импортирует numpy.ma
+        chosen = radii == radius
+        dx, dy = _disk_offsets(radius)
+        px = (xs[chosen, None] + dx).ravel()
+        py = (ys[chosen, None] + dy).ravel()
+        value = np.repeat(values[chosen], dx.size)
+        inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+        pixels[px[inside], py[inside]] = value[inside]
+
+
+def _grass_tile(height):
+    """Маска травинки (20 x height): треугольник (0, h-10), (15, h-20), (10, h-5)"""
+    xs, ys = np.meshgrid(np.arange(20) + 0.5, np.arange(height) + 0.5, indexing='ij')
+    (ax, ay), (bx, by), (cx, cy) = (0, height - 10), (15, height - 20), (10, height - 5)
+
+    def side(x1, y1, x2, y2):
+        return (x2 - x1) * (ys - y1) - (y2 - y1) * (xs - x1)
+
+    d1, d2, d3 = side(ax, ay, bx, by), side(bx, by, cx, cy), side(cx, cy, ax, ay)
+    negative = (d1 < 0) | (d2 < 0) | (d3 < 0)
+    positive = (d1 > 0) | (d2 > 0) | (d3 > 0)
+    return ~(negative & positive)
+
+
+def paint_field(surface, grid_size, seed):
+    """Вспаханное поле на 32-битной поверхности"""
+    rng = random.Random(seed)
+    width, height = surface.get_size()
+    surface.fill(DARK_BROWN)
+    pixels = pygame.surfarray.pixels2d(surface)
+    light, grass = _map_colors(surface, (LIGHT_BROWN, GRASS_COLOR))
+    # Борозды толщиной 3 пикселя каждые две клетки
+    for y in range(0, height, grid_size * 2):
+        pixels[:, max(0, y - 1):y + 2] = light
+    # 200 точек грязи: x, y, радиус, цвет
+    dots = np.array([(rng.randint(0, width), rng.randint(0, height), rng.randint(1, 3),
+                      rng.randint(80, 120), rng.randint(50, 80), rng.randint(20, 40)) for _ in range(200)])
+    xs, ys, radii, colors = dots[:, 0], dots[:, 1], dots[:, 2], dots[:, 3:]
+    _stamp_circles(pixels, xs, ys, radii, _map_colors(surface, colors))
+    # Травка вдоль нижнего края: одна травинка на каждые 20 пикселей
+    rows = min(20, height)
+    mask = np.tile(_grass_tile(rows), (-(-width // 20), 1))[:width]
+    bottom = pixels[:, height - rows:]
+    bottom[mask] = grass
+    del pixels, bottom  # Отпускаем блокировку поверхности
+
+
+def _paint_wall(surface, tile, rng, horizontal):
+    """Шахматка и камни одной полосы; возвращает ее пиксели в осях (вдоль, поперек) и цвет трещин"""
+    surface_pixels = pygame.surfarray.pixels2d(surface)  # Оси (x, y)
+    pixels = surface_pixels if horizontal else surface_pixels.T
+    length, thickness = pixels.shape
+    base, alt, stone, crack = _map_colors(surface, (WALL_BASE, WALL_ALT, WALL_STONE, WALL_CRACK))
+    # Шахматный паттерн: четность плитки вдоль XOR поперек выбирает цвет из пары
+    parity = ((np.arange(length) // tile) & 1)[:, None] ^ ((np.arange(thickness) // tile) & 1)[None, :]
+    pixels[...] = np.array([alt, base], np.uint32)[parity]
+    # 40 камней: x, y, радиус
+    width, height = surface.get_size()
+    stones = np.array([(rng.randint(0, width - 1), rng.randint(0, height - 1), rng.randint(2, 4))
+                       for _ in range(40)])
+    _stamp_circles(surface_pixels, stones[:, 0], stones[:, 1], stones[:, 2], np.full(len(stones), stone, np.uint32))
+    return pixels, crack
+
+
+def _paint_cracks(pixels, crack, rng):
+    """12 трещин вдоль стены"""
+    length, thickness = pixels.shape
+    for _ in range(12):
+        start = rng.randint(0, length - 1)
+        end = min(length - 1, start + rng.randint(30, 120))
+        pixels[start:end + 1, rng.randint(2, thickness - 3)] = crack
+
+
+def paint_walls(wall_h, wall_v, thickness, seed):
+    """Горизонтальная и вертикальная полосы стены (32-битные поверхности)"""
+    # Случайные числа в том же порядке, что и в _draw_walls: без NumPy та же раскладка
+    rng = random.Random(seed)
+    tile = max(8, thickness // 2)
+    horizontal = _paint_wall(wall_h, tile, rng, True)
+    vertical = _paint_wall(wall_v, tile, rng, False)
+    _paint_cracks(*horizontal, rng)
+    _paint_cracks(*vertical, rng)
+    del horizontal, vertical  # Отпускаем блокировку поверхностей
+
+
+# ---- pygame.draw (без NumPy) ----
+
+def _draw_field(surface, grid_size, seed):
+    rng = random.Random(seed)
+    width, height = surface.get_size()
+    surface.fill(DARK_BROWN)
+    for y in range(0, height, grid_size * 2):
+        pygame.draw.line(surface, LIGHT_BROWN, (0, y), (width, y), 3)
+    for _ in range(200):
+        x = rng.randint(0, width)
+        y = rng.randint(0, height)
+        size = rng.randint(1, 3)
+        color = (rng.randint(80, 120), rng.randint(50, 80), rng.randint(20, 40))
+        pygame.draw.circle(surface, color, (x, y), size)
+    for x in range(0, width, 20):
+        pygame.draw.polygon(surface, GRASS_COLOR, [(x, height - 10), (x + 15, height - 20), (x + 10, height - 5)])
+
+
+def _draw_walls(wall_h, wall_v, thickness, seed):
+    tile = max(8, thickness // 2)
+    width, height = wall_h.get_width(), wall_v.get_height()
+    for wall in (wall_h, wall_v):
+        wall.fill(WALL_BASE)
+        w, h = wall.get_size()
+        for y in range(0, h, tile):
+            for x in range(0, w, tile):
+                if ((x // tile) + (y // tile)) % 2 == 0:
+                    pygame.draw.rect(wall, WALL_ALT, (x, y, tile, tile))
+    rng = random.Random(seed)
+    for _ in range(40):
+        pygame.draw.circle(wall_h, WALL_STONE, (rng.randint(0, width - 1), rng.randint(0, thickness - 1)),
+                           rng.randint(2, 4))
+    for _ in range(40):
+        pygame.draw.circle(wall_v, WALL_STONE, (rng.randint(0, thickness - 1), rng.randint(0, height - 1)),
+                           rng.randint(2, 4))
+    for _ in range(12):
+        x1 = rng.randint(0, width - 1)
+        x2 = min(width - 1, x1 + rng.randint(30, 120))
+        y = rng.randint(2, thickness - 3)
+        pygame.draw.line(wall_h, WALL_CRACK, (x1, y), (x2, y), 1)
+    for _ in range(12):
+        y1 = rng.randint(0, height - 1)
+        y2 = min(height - 1, y1 + rng.randint(30, 120))
+        x = rng.randint(2, thickness - 3)
+        pygame.draw.line(wall_v, WALL_CRACK, (x, y1), (x, y2), 1)
+
+
+# ---- Готовые поверхности ----
+
+def field_surface(width, height, grid_size, seed=FIELD_SEED):
+    """Фон поля width x height"""
+    def build():
+        surface = new_surface((width, height))
+        (paint_field if np is not None else _draw_field)(surface, grid_size, seed)
+        return [surface]
+    return cached_surfaces(f'field{grid_size}', seed, (width, height), build)[0]
+
+
+def wall_surfaces(width, height, thickness, seed=WALL_SEED):
+    """Полосы стены: (горизонтальная width x thickness, вертикальная thickness x height)"""
+    def build():
+        wall_h = new_surface((width, thickness))
+        wall_v = new_surface((thickness, height))
+        (paint_walls if np is not None else _draw_walls)(wall_h, wall_v, thickness, seed)
+        return [wall_h, wall_v]
+    return cached_surfaces(f'walls{thickness}', seed, (width, height), build)
@@ -0,0 +1,198 @@
+import atexit
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pygame
+
+from .assets import texts
+
+# Профилирование кадра по подсистемам. Каждый кадр начинается с begin_frame() (он же
+# закрывает предыдущий), участки внутри меряются через `with profiler.section('имя'):`. Последние window
+# кадров хранятся в кольцевых буферах, по ним считаются перцентили p50/p95/p99.
+# Кадр считается пропущенным, если от начала прошлого кадра прошло больше
+# полутора бюджетов (1/fps): на экране один и тот же кадр показался дважды.
+#
+# Оверлей (F3) перерисовывает таблицу цифр не чаще refresh раз в секунду - иначе
+# сам рендер текста стал бы заметной строкой в профиле.
+
+# static - фон, стены и камни (один blit готового слоя); draw - весь draw_dirty()
+# в режиме --dirty-rects (там подсистемы не разделить)
+SECTIONS = ('events', 'update', 'draw', 'static', 'snake', 'items', 'hud', 'flip')
+
+
+class CsvSink:
+    """Кадры в CSV: номер кадра, длительность, пропуск и время каждой подсистемы (мс)"""
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.file.write(','.join(('frame', 'frame_ms', 'dropped') + SECTIONS) + '\n')
+
+    def write(self, frame, frame_ms, dropped, sections):
+        values = [str(frame), f'{frame_ms:.3f}', '1' if dropped else '0']
+        values += [f'{sections.get(name, 0.0):.3f}' for name in SECTIONS]
+        self.file.write(','.join(values) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+class JsonLinesSink:
+    """Кадры в JSON lines: по объекту на строку, только подсистемы, отработавшие в кадре"""
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, frame, frame_ms, dropped, sections):
+        record = {'frame': frame, 'frame_ms': round(frame_ms, 3), 'dropped': dropped}
+        record.update((name, round(ms, 3)) for name, ms in sections.items())
+        self.file.write(json.dumps(record) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+def open_sink(path):
+    """Формат по расширению: .csv - CSV, иначе JSON lines"""
+    if path.lower().endswith('.csv'):
+        return CsvSink(path)
+    return JsonLinesSink(path)
+
+
+def percentile(sorted_values, p):
+    """p-й перцентиль (0..100) уже отсортированного списка, ближайший ранг"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))
+    return sorted_values[index]
+
+
+class StartupTimer:
+    """Разбивка времени запуска по этапам: stage(имя) закрывает этап, начатый предыдущим вызовом"""
+    def __init__(self, start=None, time_func=time.perf_counter):
+        self.time_func = time_func
+        self.start = self.last = start if start is not None else time_func()
+        self.stages = []  # (этап, мс)
+
+    def stage(self, name):
+        now = self.time_func()
+        self.stages.append((name, (now - self.last) * 1000.0))
+        self.last = now
+
+    @property
+    def total(self):
+        """Мс от начала до последнего закрытого этапа"""
+        return (self.last - self.start) * 1000.0
+
+    def report(self):
+        parts = ', '.join(f'{name} {ms:.0f}' for name, ms in self.stages)
+        return f"⏱️ Запуск за {self.total:.0f} мс: {parts}"
+
+
+class FrameProfiler:
+    """Время кадра и подсистем за последние window кадров (+ запись в sink, если задан)"""
+    def __init__(self, fps=60, window=600, sink=None, time_func=time.perf_counter):
+        self.budget = 1000.0 / (fps or 60)  # мс на кадр; без ограничения FPS меряем от 60 Гц
+        self.window = window
+        self.sink = sink
+        self.time_func = time_func
+        self.frames = deque(maxlen=window)  # Длительности кадров, мс
+        self.samples = {}  # Подсистема -> deque длительностей, мс
+        self.current = {}  # Подсистема -> мс в текущем кадре
+        self.frame_count = 0
+        self.dropped = 0  # Пропущенные кадры за всю сессию
+        self.frame_start = None
+        self.overlay_visible = False
+        self.refresh = 2
+        self.font_size = 22  # Меньше при --cell 20/10: окно растягивается до экрана
+        self._overlay = None
+        self._overlay_time = 0.0
+        self._mono = None
+        if sink is not None:
+            atexit.register(self.close)  # Дописать буфер файла при любом выходе (sys.exit из меню)
+
+    def begin_frame(self):
+        now = self.time_func()
+        if self.frame_start is not None:
+            self._finish_frame((now - self.frame_start) * 1000.0)
+        self.frame_start = now
+        self.current = {}
+
+    def skip_frame(self):
+        """Кадр прервал блокирующий экран (меню, ввод имени) - не считаем его"""
+        self.frame_start = None
+        self.current = {}
+
+    def _finish_frame(self, frame_ms):
+        dropped = frame_ms > self.budget * 1.5
+        self.frame_count += 1
+        self.dropped += dropped
+        self.frames.append(frame_ms)
+        for name, ms in self.current.items():
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+            samples.append(ms)
+        if self.sink is not None:
+            self.sink.write(self.frame_count, frame_ms, dropped, self.current)
+
+    @contextmanager
+    def section(self, name):
+        start = self.time_func()
+        try:
+            yield
+        finally:
+            elapsed = (self.time_func() - start) * 1000.0
+            self.current[name] = self.current.get(name, 0.0) + elapsed
+
+    def stats(self, name=None):
+        """(p50, p95, p99) в мс для подсистемы или, без имени, для всего кадра"""
+        values = sorted(self.frames if name is None else self.samples.get(name, ()))
+        return tuple(percentile(values, p) for p in (50, 95, 99))
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+        self._overlay = None
+
+    def _font(self):
+        if self._mono is None:
+            # Моноширинный шрифт, чтобы столбцы не разъезжались (поиск шрифта медленный - один раз)
+            self._mono = texts.font(self.font_size, pygame.font.match_font('dejavusansmono,couriernew,monospace'))
+        return self._mono
+
+    def _build_overlay(self):
+        font = self._font()
+        lines = [f"{'':<11}{'p50':>7}{'p95':>7}{'p99':>7}  ms"]
+        p50, p95, p99 = self.stats()
+        lines.append(f"{'frame':<11}{p50:7.2f}{p95:7.2f}{p99:7.2f}")
+        for name in SECTIONS:
+            if name in self.samples:
+                p50, p95, p99 = self.stats(name)
+                lines.append(f"{name:<11}{p50:7.2f}{p95:7.2f}{p99:7.2f}")
+        lines.append(f"dropped {self.dropped} / {self.frame_count}")
+        rendered = [font.render(line, True, (220, 255, 220)) for line in lines]
+        width = max(surface.get_width() for surface in rendered) + 16
+        height = sum(surface.get_height() for surface in rendered) + 16
+        panel = pygame.Surface((width, height))
+        panel.fill((0, 0, 0))
+        y = 8
+        for surface in rendered:
+            panel.blit(surface, (8, y))
+            y += surface.get_height()
+        return panel.convert() if pygame.display.get_surface() else panel
+
+    def draw_overlay(self, screen):
+        """Рисует таблицу в правом нижнем углу; возвращает ее прямоугольник (или None)"""
+        if not self.overlay_visible:
+            return None
+        now = self.time_func()
+        if self._overlay is None or now - self._overlay_time >= 1.0 / self.refresh:
+            self._overlay = self._build_overlay()
+            self._overlay_time = now
+        rect = self._overlay.get_rect(bottomright=(screen.get_width() - 10, screen.get_height() - 10))
+        screen.blit(self._overlay, rect)
+        return rect
+
+    def close(self):
+        if self.sink is not None:
+            self.sink.close()
+            self.sink = None
@@ -0,0 +1,165 @@
+import struct
+
+# Повторы партий: зерно генератора случайных чисел + поток команд по номерам тиков.
+# Правила детерминированы (всё случайное берется из GameState.rng), поэтому этого хватает,
+# чтобы воспроизвести партию целиком - с отрисовкой или без окна на максимальной скорости.
+#
+# Формат файла (.snkr), little-endian:
+#   заголовок: b'SNKR', версия u8, зерно u32, ширина u8, высота u8, тиков u32, очки u32, уровень u16
+#   события:   разница тиков от предыдущего события (varint), код u8 [, значение u8]
+#              коды 0..3 - поворот вправо/вниз/влево/вверх, 4 - новая base_move_interval
+
+MAGIC = b'SNKR'
+# Версия меняется вместе с правилами или порядком случайных чисел: старый повтор
+# на новых правилах разошелся бы с записанным результатом
+VERSION = 3
+_HEADER = struct.Struct('<4sBIBBIIH')
+
+DIRECTION_CODES = {(1, 0): 0, (0, 1): 1, (-1, 0): 2, (0, -1): 3}
+CODE_DIRECTIONS = {code: direction for direction, code in DIRECTION_CODES.items()}
+SPEED = 4
+
+
+class ReplayError(ValueError):
+    """Файл повтора поврежден или другого формата"""
+
+
+class Replay:
+    """Записанная партия: зерно, размер поля, события (тик, код, значение) и итог"""
+    def __init__(self, seed, width, height, events=None, ticks=0, score=0, level=1):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.events = events if events is not None else []
+        self.ticks = ticks
+        self.score = score
+        self.level = level
+
+    def to_bytes(self):
+        out = bytearray(_HEADER.pack(MAGIC, VERSION, self.seed, self.width, self.height,
+                                     self.ticks, self.score, self.level))
+        previous = 0
+        for tick, code, value in self.events:
+            delta = tick - previous
+            previous = tick
+            # varint: по 7 бит, старший бит - "есть продолжение"
+            while delta >= 0x80:
+                out.append((delta & 0x7F) | 0x80)
+                delta >>= 7
+            out.append(delta)
+            out.append(code)
+            if code == SPEED:
+                out.append(value)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < _HEADER.size:
+            raise ReplayError("файл повтора слишком короткий")
+        magic, version, seed, width, height, ticks, score, level = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ReplayError("это не файл повтора или неизвестная версия")
+        events = []
+        tick = 0
+        pos = _HEADER.size
+        try:
+            while pos < len(data):
+                delta = shift = 0
+                while True:
+                    byte = data[pos]
+                    pos += 1
+                    delta |= (byte & 0x7F) << shift
+                    shift += 7
+                    if byte < 0x80:
+                        break
+                tick += delta
+                code = data[pos]
+                pos += 1
+                value = None
+                if code == SPEED:
+                    value = data[pos]
+                    pos += 1
+                elif code not in CODE_DIRECTIONS:
+                    raise ReplayError(f"неизвестный код события {code}")
+                events.append((tick, code, value))
+        except IndexError:
+            raise ReplayError("файл повтора обрезан")
+        return cls(seed, width, height, events, ticks, score, level)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+class ReplayRecorder:
+    """Пишет команды, дошедшие до GameState (steer и скорость в tick), с номерами тиков"""
+    def __init__(self):
+        self.replay = None
+        self.speed = None
+
+    def start(self, state):
+        """Новая запись с зерном партии (вызывается из GameState.reset)"""
+        self.replay = Replay(state.seed, state.grid_width, state.grid_height)
+        self.speed = None
+
+    def steer(self, tick, direction):
+        code = DIRECTION_CODES.get(direction)
+        if code is not None:
+            self.replay.events.append((tick, code, None))
+
+    def set_speed(self, tick, base_move_interval):
+        if base_move_interval != self.speed:
+            self.speed = base_move_interval
+            self.replay.events.append((tick, SPEED, base_move_interval))
+
+    def finish(self, state):
+        """Закрывает запись итогом партии и возвращает Replay"""
+        self.replay.ticks = state.tick_count
+        self.replay.score = state.score
+        self.replay.level = state.level
+        return self.replay
+
+
+class ReplayPlayer:
+    """Подает записанные события в GameState перед каждым тиком"""
+    def __init__(self, replay):
+        self.replay = replay
+        self.pos = 0
+        self.speed = 10
+
+    def apply(self, state):
+        """Применяет события текущего тика и возвращает base_move_interval для state.tick()"""
+        events = self.replay.events
+        while self.pos < len(events) and events[self.pos][0] <= state.tick_count:
+            _, code, value = events[self.pos]
+            if code == SPEED:
+                self.speed = value
+            else:
+                state.steer(CODE_DIRECTIONS[code])
+            self.pos += 1
+        return self.speed
+
+    def finished(self, state):
+        return state.game_over or state.tick_count >= self.replay.ticks
+
+
+def simulate(replay, state=None):
+    """Проигрывает повтор без отрисовки на максимальной скорости, возвращает итоговый GameState"""
+    if state is None:
+        from .state import GameState
+        state = GameState(replay.width, replay.height, seed=replay.seed)
+    player = ReplayPlayer(replay)
+    while not player.finished(state):
+        state.tick(player.apply(state))
+    return state
+
+
+def verify(replay):
+    """Совпадает ли записанный результат с пересчитанным"""
+    state = simulate(replay)
+    return state.score == replay.score and state.level == replay.level and state.tick_count == replay.ticks
@@ -0,0 +1,726 @@
+import heapq
+import random
+from collections import deque
+from .replay import ReplayRecorder
+
+# Чистая логика игры без pygame: можно симулировать тысячи партий без окна и текстур.
+# Классы из index.py наследуются от этих и добавляют только загрузку текстур и отрисовку.
+
+GRID_WIDTH = 48  # 1920 // 40
+GRID_HEIGHT = 27  # 1080 // 40
+
+
+class FreeCells:
+    """Индекс свободных клеток поля: случайная свободная клетка за O(1).
+
+    Свободные клетки лежат в массиве, позиция каждой - в словаре; занятая клетка
+    удаляется обменом с последней. Клетку могут занимать несколько владельцев
+    (голова змейки на предмете), поэтому считаем их количество.
+    """
+    _templates = {}  # (width, height) -> пустое поле; копировать быстрее, чем строить заново
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT, rng=None):
+        self.width = width
+        self.height = height
+        # Генератор случайных чисел партии - через него идут все спавны (для повторов)
+        self.rng = rng if rng is not None else random
+        template = self._templates.get((width, height))
+        if template is None:
+            cells = [(x, y) for y in range(height) for x in range(width)]
+            template = self._templates[(width, height)] = (cells, {cell: i for i, cell in enumerate(cells)})
+        self.cells = template[0].copy()
+        self.index = template[1].copy()
+        self.owners = {}  # Занятая клетка -> число владельцев
+
+    def __len__(self):
+        return len(self.cells)
+
+    @property
+    def full(self):
+        """Свободных клеток не осталось"""
+        return not self.cells
+
+    def is_free(self, cell):
+        return cell in self.index
+
+    def take(self, cell):
+        x, y = cell
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return  # Голова за краем поля (до обёртывания или перед Game Over)
+        count = self.owners.get(cell, 0)
+        self.owners[cell] = count + 1
+        if count == 0:
+            i = self.index.pop(cell)
+            last = self.cells.pop()
+            if last != cell:
+                self.cells[i] = last
+                self.index[last] = i
+
+    def release(self, cell):
+        count = self.owners.get(cell, 0)
+        if count > 1:
+            self.owners[cell] = count - 1
+        elif count == 1:
+            del self.owners[cell]
+            self.index[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def sample(self):
+        """Случайная свободная клетка или None, если поле заполнено"""
+        if not self.cells:
+            return None
+        return self.cells[self.rng.randrange(len(self.cells))]
+
+
+class SnakeState:
+    """Змейка без графики: тело, направление, движение"""
+    def __init__(self, board=None):
+        self.board = board  # Общий индекс свободных клеток (FreeCells)
+        # deque: вставка головы и удаление хвоста за O(1), индексы body[0]/body[-1] тоже O(1)
+        self.body = deque([(10, 10), (9, 10), (8, 10)])  # Начинаем с 3 сегментов
+        self.direction = (1, 0)
+        self.next_direction = (1, 0)
+        self.last_tail = None  # Клетка, освобожденная последним move() (для интерполяции)
+        # Сколько сегментов занимает клетку (после grow() хвост временно двойной).
+        # Обновляется в move/grow/shrink, чтобы проверки занятости были O(1)
+        self.occupied = {}
+        for segment in self.body:
+            self._occupy(segment)
+
+    def _occupy(self, cell):
+        count = self.occupied.get(cell, 0)
+        self.occupied[cell] = count + 1
+        if count == 0 and self.board is not None:
+            self.board.take(cell)
+
+    def _release(self, cell):
+        count = self.occupied[cell] - 1
+        if count:
+            self.occupied[cell] = count
+        else:
+            del self.occupied[cell]
+            if self.board is not None:
+                self.board.release(cell)
+
+    def occupies(self, cell):
+        """Есть ли сегмент змейки в клетке"""
+        return cell in self.occupied
+
+    def hits_itself(self):
+        """Голова совпадает с другим сегментом"""
+        return self.occupied.get(self.body[0], 0) > 1
+
+    def move(self):
+        head_x, head_y = self.body[0]
+        dx, dy = self.next_direction
+        new_head = (head_x + dx, head_y + dy)
+        self.body.appendleft(new_head)
+        self._occupy(new_head)
+        self.last_tail = self.body.pop()
+        self._release(self.last_tail)
+        self.direction = self.next_direction
+
+    def set_head(self, cell):
+        """Переносит голову (обёртывание через края)"""
+        self._release(self.body[0])
+        self.body[0] = cell
+        self._occupy(cell)
+
+    def grow(self):
+        self.body.append(self.body[-1])
+        self._occupy(self.body[-1])
+
+    def shrink(self):
+        """Убирает последний сегмент"""
+        self._release(self.body.pop())
+
+    def set_direction(self, direction):
+        if (direction[0] * -1, direction[1] * -1) != self.direction:
+            self.next_direction = direction
+
+
+class Timers:
+    """Планировщик по тикам (очередь с приоритетом).
+
+    Вместо того чтобы каждый тик уменьшать таймер у каждого предмета, событие кладется
+    в кучу с номером тика срабатывания; advance() снимает только наступившие события,
+    поэтому тик, в котором ничего не истекает, стоит O(1) при любом числе таймеров.
+    События одного тика выполняются по order (порядок предметов на поле), затем по
+    порядку постановки - так партия с тем же зерном остается той же.
+    """
+    def __init__(self):
+        self.now = 0  # Номер последнего обработанного тика
+        self.queue = []  # [тик, order, номер постановки, callback]
+        self.counter = 0
+
+    def schedule(self, delay, callback, order=0):
+        """Вызвать callback через delay тиков. Возвращает handle для cancel()"""
+        event = [self.now + delay, order, self.counter, callback]
+        self.counter += 1
+        heapq.heappush(self.queue, event)
+        return event
+
+    def cancel(self, event):
+        """Отменяет событие (оно останется в куче пустым и будет выброшено в свой тик)"""
+        event[3] = None
+
+    def advance(self):
+        """Следующий тик: выполняет все события, срок которых наступил"""
+        self.now += 1
+        queue = self.queue
+        while queue and queue[0][0] <= self.now:
+            callback = heapq.heappop(queue)[3]
+            if callback is not None:
+                callback()
+
+    def __len__(self):
+        return len(self.queue)
+
+
+class ItemType:
+    """Вид предмета - строка таблицы ITEM_TYPES.
+
+    points - очки (или диапазон (от, до), разыгрываемый при каждом появлении),
+    combo - предмет продолжает цепочку комбо (иначе сбрасывает ее),
+    multiply - очки умножаются на комбо, growth - 1 растит змейку, -1 укорачивает
+    (не короче 3), effect - (эффект GameState.EFFECTS, длительность в тиках), lifetime - через сколько
+    тиков предмет перепрыгивает на новое место (None - лежит, пока не съедят),
+    count - сколько таких предметов одновременно на поле.
+    """
+    def __init__(self, name, texture, points=0, lifetime=None, combo=False, multiply=False,
+                 growth=1, effect=None, rumble=None, level_up=True, count=1, fallback_color=None):
+        self.name = name
+        self.texture = texture  # Файл в assets/ (используется только в index.py)
+        self.points = points
+        self.lifetime = lifetime
+        self.combo = combo
+        self.multiply = multiply
+        self.growth = growth
+        self.effect = effect
+        self.rumble = rumble  # (low, high, мс) для геймпада
+        self.level_up = level_up
+        self.count = count
+        self.fallback_color = fallback_color  # Цвет квадрата, если текстура не загрузилась
+
+
+# Все предметы игры. Порядок - порядок появления на поле при старте партии.
+# Новый предмет - новая строка здесь (и текстура в assets/), GameState.update() не меняется.
+ITEM_TYPES = {kind.name: kind for kind in [
+    ItemType('food', 'food.png', points=(1, 5), rumble=(0.7, 0.7, 200), fallback_color=(255, 0, 0)),
+    # Яблоко - ускорение на 2.5 с
+    ItemType('bonus', 'bonus_apple.png', points=3, lifetime=1000, combo=True, multiply=True,
+             effect=('boost', 150), rumble=(1.0, 0.5, 300)),
+    # Паук - замедление на 2.5 с
+    ItemType('debuff', 'debuff_spider.png', points=-1, lifetime=800,
+             effect=('slowdown', 150), rumble=(0.3, 0.8, 200), level_up=False),
+    # Клубника - укорачивает змею
+    ItemType('strawberry', 'strawberry.png', points=5, lifetime=800, combo=True, multiply=True,
+             growth=-1, rumble=(0.8, 0.6, 250)),
+    ItemType('diamond', 'diamond.png', points=10, lifetime=600, combo=True, multiply=True,
+             rumble=(1.0, 1.0, 400)),
+    # Звезда - неуязвимость на 5 с
+    ItemType('star', 'star.png', points=2, lifetime=1000, combo=True,
+             effect=('invincible', 300), rumble=(0.5, 0.5, 200)),
+    # Гриб - реверс управления на 3 с
+    ItemType('mushroom', 'mushroom.png', points=1, lifetime=700,
+             effect=('reverse', 180), rumble=(0.6, 0.4, 250)),
+    # Лёд - заморозка на 10 с
+    ItemType('ice', 'ice.png', points=1, lifetime=600,
+             effect=('freeze', 600), rumble=(0.4, 0.8, 150)),
+]}
+
+
+class ItemState:
+    """Один предмет на поле без графики"""
+    def __init__(self, kind, board, cells, timers, order=0):
+        self.kind = kind
+        self.board = board
+        self.cells = cells  # Общий пространственный хеш ItemField: клетка -> предмет
+        self.timers = timers  # Общий планировщик партии
+        self.order = order  # Место в ItemField (порядок срабатывания в одном тике)
+        self.position = None
+        self.points = 0
+        self.expiry = None  # Запланированный переспавн
+        self.spawn()
+
+    @property
+    def timer(self):
+        """Сколько тиков осталось до переспавна"""
+        return max(0, self.expiry[0] - self.timers.now) if self.expiry is not None else 0
+
+    def spawn(self):
+        """Переносит предмет в случайную свободную клетку. None - поле заполнено"""
+        if self.position is not None:
+            self.board.release(self.position)
+            del self.cells[self.position]
+        if self.expiry is not None:
+            self.timers.cancel(self.expiry)
+        self.position = self.board.sample()
+        # Если места нет, предмет спрятан и попробует снова через lifetime тиков
+        # (предмет без времени жизни - в следующем тике)
+        delay = self.kind.lifetime
+        if delay is None and self.position is None:
+            delay = 1
+        self.expiry = self.timers.schedule(delay, self.spawn, self.order) if delay is not None else None
+        if self.position is None:
+            return None
+        self.board.take(self.position)
+        self.cells[self.position] = self
+        points = self.kind.points
+        self.points = self.board.rng.randint(*points) if isinstance(points, tuple) else points
+        return self.position
+
+
+class ItemField:
+    """Все предметы партии и пространственный хеш клетка -> предмет (подбор - один поиск)"""
+    def __init__(self, board, kinds=None, item_class=ItemState, timers=None, **kwargs):
+        self.board = board
+        self.item_class = item_class
+        self.timers = timers if timers is not None else Timers()
+        self.kwargs = kwargs  # Дополнительные аргументы item_class (grid_size в index.py)
+        self.cells = {}
+        self.items = []
+        for kind in (kinds if kinds is not None else ITEM_TYPES.values()):
+            for _ in range(kind.count):
+                self.add(kind)
+
+    def add(self, kind):
+        """Кладет на поле еще один предмет вида kind"""
+        item = self.item_class(kind, self.board, self.cells, self.timers, len(self.items), **self.kwargs)
+        self.items.append(item)
+        return item
+
+    def at(self, cell):
+        """Предмет в клетке или None"""
+        return self.cells.get(cell)
+
+    def of_kind(self, name):
+        return [item for item in self.items if item.kind.name == name]
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+MAX_OBSTACLES = 15  # Предел камней на стандартном поле 48х27
+
+
+def max_obstacles(width, height):
+    """Предел числа камней: на больших полях столько же на единицу площади, сколько 15 на 48х27"""
+    return MAX_OBSTACLES * width * height // (GRID_WIDTH * GRID_HEIGHT)
+
+
+# Кольцо из 12 клеток вокруг камня 2х2 (смещения от якоря), по порядку обхода
+_RING = ((-1, -1), (0, -1), (1, -1), (2, -1), (2, 0), (2, 1),
+         (2, 2), (1, 2), (0, 2), (-1, 2), (-1, 1), (-1, 0))
+
+
+class ObstacleState:
+    """Камни 2х2 без графики.
+
+    Клетки камней хранятся битовой доской: целое число, где бит y * width + x - клетка (x, y).
+    Столкновение - проверка одного бита, а допустимые места для камня получаются
+    "эрозией" маски свободных клеток: якорь годится, если свободны он, сосед справа,
+    снизу и по диагонали, т.е. free & free >> 1 & free >> width & free >> (width + 1).
+
+    Камни не делят поле на части: все клетки без камней остаются достижимыми от головы
+    (проверка заливкой, тоже на битовых масках), и перед головой по направлению
+    движения остается safe_distance клеток без камней.
+    """
+    _masks = {}  # (width, height) -> маски поля (см. _board_masks)
+    safe_distance = 6  # Клеток без камней перед головой (1 с при обычной скорости)
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT, count=5, board=None):
+        self.width = width
+        self.height = height
+        self.count = count
+        self.board = board if board is not None else FreeCells(width, height)
+        self.positions = []  # Позиции левого верхнего угла камня 2х2
+        self.bits = 0  # Битовая доска клеток камней
+
+    def _board_masks(self):
+        masks = self._masks.get((self.width, self.height))
+        if masks is None:
+            w, h = self.width, self.height
+            full = (1 << (w * h)) - 1
+            # Якорь x от 2 до width - 4, y от 2 до height - 4 (камень 2х2 не касается края)
+            cells = [y * w + x for y in range(2, h - 3) for x in range(2, w - 3)]
+            first_col = sum(1 << (y * w) for y in range(h))
+            first_row = (1 << w) - 1
+            masks = self._masks[(w, h)] = {
+                'full': full,
+                'area': sum(1 << i for i in cells),
+                'area_cells': cells,
+                'first_col': first_col,
+                'last_col': first_col << (w - 1),
+                'first_row': first_row,
+                'last_row': first_row << (w * (h - 1)),
+            }
+        return masks
+
+    def reachable(self, start, wrap=True):
+        """Битовая маска клеток без камней, достижимых из клетки start.
+
+        Заливка целыми масками: за шаг фронт расширяется на клетку во все стороны
+        (сдвиги на 1 и на width), пока маска не перестанет расти. wrap - сквозные края.
+        """
+        w, h = self.width, self.height
+        masks = self._board_masks()
+        x, y = start
+        if not (0 <= x < w and 0 <= y < h):
+            return 0
+        open_cells = masks['full'] & ~self.bits
+        reach = (1 << (y * w + x)) & open_cells
+        inner_right = masks['full'] & ~masks['first_col']  # Сдвиг вправо не переходит на новую строку
+        inner_left = masks['full'] & ~masks['last_col']
+        first_col, last_col = masks['first_col'], masks['last_col']
+        first_row, last_row = masks['first_row'], masks['last_row']
+        vertical_wrap = w * (h - 1)
+        while True:
+            grown = reach | (reach << 1 & inner_right) | (reach >> 1 & inner_left) | (reach << w) | (reach >> w)
+            if wrap:
+                grown |= ((reach & last_col) >> (w - 1)) | ((reach & first_col) << (w - 1))
+                grown |= ((reach & last_row) >> vertical_wrap) | ((reach & first_row) << vertical_wrap)
+            grown &= open_cells
+            if grown == reach:
+                return reach
+            reach = grown
+
+    def _splits_field(self, anchor, start, wrap):
+        """Разделит ли камень с якорем anchor поле (self.bits уже содержит этот камень)"""
+        w = self.width
+        # Если свободные клетки кольца вокруг камня идут одним куском, любой путь через
+        # камень можно обойти по кольцу - заливка не нужна
+        window = (self.bits >> (anchor - w - 1)) & ((1 << (4 * w)) - 1)  # Окно 4 строки вокруг камня
+        ring = [not window >> ((dy + 1) * w + dx + 1) & 1 for dx, dy in _RING]
+        runs = sum(1 for i, is_open in enumerate(ring) if is_open and not ring[i - 1])
+        if runs <= 1:
+            return False
+        return self.reachable(start, wrap) != self._board_masks()['full'] & ~self.bits
+
+    def _path_ahead(self, snake, wrap):
+        """Маска клеток перед головой на safe_distance шагов по направлению движения"""
+        w, h = self.width, self.height
+        (x, y), (dx, dy) = snake.body[0], snake.direction
+        path = 0
+        for _ in range(self.safe_distance):
+            x, y = x + dx, y + dy
+            if wrap:
+                x, y = x % w, y % h
+            elif not (0 <= x < w and 0 <= y < h):
+                break
+            path |= 1 << (y * w + x)
+        return path
+
+    def generate_obstacles(self, snake=None, wrap=True):
+        """Генерирует случайные препятствия 2х2 на свободных клетках (не на змее и предметах).
+
+        Камень, после которого часть поля стала бы недостижимой, не ставится.
+        wrap - края поля сквозные (до 6 уровня), иначе по периметру стены.
+        """
+        for x, y in self.positions:
+            for cell in ((x, y), (x+1, y), (x, y+1), (x+1, y+1)):
+                self.board.release(cell)
+        self.positions = []
+        self.bits = 0
+        w = self.width
+        masks = self._board_masks()
+        anchors, area_cells = masks['area'], masks['area_cells']
+        if not area_cells:
+            return  # Поле слишком маленькое для камней
+
+        # Свободные клетки: все, кроме занятых змейкой, предметами (и камнями) на общем поле
+        free = masks['full']
+        for x, y in self.board.owners:
+            free &= ~(1 << (y * w + x))
+        anchors &= free & (free >> 1) & (free >> w) & (free >> (w + 1))
+
+        head = None
+        if snake:
+            # Исключаем горизонтальную линию, где спавнится змея: ее строку, одну сверху и две снизу
+            snake_y = snake.body[0][1]
+            row = (1 << w) - 1
+            for y in range(snake_y - 1, snake_y + 3):
+                if 0 <= y < self.height:
+                    anchors &= ~(row << (y * w))
+            # Никаких камней прямо по курсу: якоря, чей камень накрыл бы клетку пути
+            path = self._path_ahead(snake, wrap)
+            anchors &= ~(path | (path >> 1) | (path >> w) | (path >> (w + 1)))
+            head = snake.body[0]
+
+        block = 0b111 | (0b111 << w) | (0b111 << (2 * w))  # Якоря 3х3 вокруг поставленного камня
+        rng = self.board.rng
+        candidates = None
+        while len(self.positions) < self.count:
+            if candidates is None:
+                # Пока поле почти пустое, случайный якорь области почти всегда годится
+                for _ in range(32):
+                    anchor = area_cells[rng.randrange(len(area_cells))]
+                    if anchors >> anchor & 1:
+                        break
+                else:
+                    # Годных якорей мало: выписываем их один раз; якорь, испорченный уже
+                    # поставленным камнем, выбрасывается при выборе
+                    digits = bin(anchors)[:1:-1]
+                    candidates = [i for i, digit in enumerate(digits) if digit == '1']
+                    continue
+            else:
+                if not candidates:
+                    break  # Места для камней больше нет
+                i = rng.randrange(len(candidates))
+                anchor = candidates[i]
+                candidates[i] = candidates[-1]
+                candidates.pop()
+                if not anchors >> anchor & 1:
+                    continue
+            rock = 0b11 << anchor | 0b11 << (anchor + w)
+            self.bits |= rock
+            if head is not None and self._splits_field(anchor, head, wrap):
+                # Этот якорь отрезал бы часть поля - больше его не предлагаем
+                self.bits &= ~rock
+                anchors &= ~(1 << anchor)
+                continue
+            anchors &= ~(block << (anchor - w - 1))
+            x, y = anchor % w, anchor // w
+            self.positions.append((x, y))
+            for cell in ((x, y), (x+1, y), (x, y+1), (x+1, y+1)):
+                self.board.take(cell)
+
+    def check_collision(self, pos):
+        """Проверяет столкновение с любой клеткой камня 2х2"""
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        return self.bits >> (y * self.width + x) & 1 == 1
+
+
+class GameState:
+    """Правила игры без отрисовки. Game из index.py подменяет классы сущностей на текстурные."""
+    snake_class = SnakeState
+    item_class = ItemState
+    obstacle_class = ObstacleState
+
+    # Временные эффекты предметов. Эффект хранит только тик окончания, поэтому
+    # "тикать" ему не нужно; ускорение и замедление отменяют друг друга
+    EFFECTS = ('boost', 'slowdown', 'invincible', 'reverse', 'freeze')
+    OPPOSITE_EFFECTS = {'boost': 'slowdown', 'slowdown': 'boost'}
+
+    def __init__(self, grid_width=GRID_WIDTH, grid_height=GRID_HEIGHT, seed=None, record=False):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.controller = None
+        self.recorder = ReplayRecorder() if record else None  # Запись повтора партии
+        self.reset(seed)
+
+    def _entity_kwargs(self):
+        """Дополнительные аргументы конструкторов сущностей (Game передает grid_size)"""
+        return {}
+
+    def reset(self, seed=None):
+        """Новая партия. Одинаковое зерно и одинаковые команды дают одинаковую партию"""
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        kwargs = self._entity_kwargs()
+        # Общий индекс свободных клеток: змейка, предметы и камни занимают в нём клетки
+        self.board = FreeCells(self.grid_width, self.grid_height, self.rng)
+        kwargs['board'] = self.board
+        size = {'width': self.grid_width, 'height': self.grid_height}
+        # Все сроки партии (жизнь предметов) - события в одном планировщике
+        self.timers = Timers()
+        self.effect_until = dict.fromkeys(self.EFFECTS, 0)  # Эффект -> тик окончания
+        self.snake = self.snake_class(**kwargs)
+        self.items = ItemField(item_class=self.item_class, timers=self.timers, **kwargs)
+
+        # Препятствия
+        self.obstacles = self.obstacle_class(count=5, **size, **kwargs)
+        self.obstacles.generate_obstacles(self.snake)  # Генерируем с учетом змеи
+
+        self.score = 0
+        self.game_over = False
+        self.combo_counter = 0  # Счетчик комбо
+        self.last_pickup_was_bonus = False  # Для отслеживания комбо
+        self.level = 1  # Текущий уровень
+        self.move_counter = 0  # Счётчик тиков до следующего move()
+        self.moved = False  # Сдвинулась ли змейка в последнем тике
+        self.tick_count = 0  # Сыгранные тики (по ним привязаны события повтора)
+        self._score_saved = False  # Флаг для сохранения рекорда
+        if self.recorder is not None:
+            self.recorder.start(self)
+
+    def effect_left(self, name):
+        """Сколько тиков еще действует эффект (0 - не действует)"""
+        return max(0, self.effect_until[name] - self.timers.now)
+
+    def start_effect(self, name, duration):
+        """Включает эффект на duration тиков (повторный подбор продлевает заново)"""
+        self.effect_until[name] = self.timers.now + duration
+        opposite = self.OPPOSITE_EFFECTS.get(name)
+        if opposite is not None:
+            self.effect_until[opposite] = 0
+
+    # Старые имена таймеров эффектов (HUD, боты): остаток в тиках
+    @property
+    def invincible_timer(self):
+        """Неуязвимость от звезды"""
+        return self.effect_left('invincible')
+
+    @invincible_timer.setter
+    def invincible_timer(self, value):
+        self.start_effect('invincible', value)
+
+    @property
+    def reverse_control_timer(self):
+        """Реверс управления от гриба"""
+        return self.effect_left('reverse')
+
+    @reverse_control_timer.setter
+    def reverse_control_timer(self, value):
+        self.start_effect('reverse', value)
+
+    @property
+    def freeze_timer(self):
+        """Заморозка от льда"""
+        return self.effect_left('freeze')
+
+    @freeze_timer.setter
+    def freeze_timer(self, value):
+        self.start_effect('freeze', value)
+
+    @property
+    def slowdown_timer(self):
+        """Замедление от паука (> 0) или ускорение от яблока (< 0)"""
+        return self.effect_left('slowdown') or -self.effect_left('boost')
+
+    @slowdown_timer.setter
+    def slowdown_timer(self, value):
+        if value < 0:
+            self.start_effect('boost', -value)
+        else:
+            self.start_effect('slowdown', value)
+
+    def set_controller(self, controller):
+        self.controller = controller
+
+    def _rumble(self, low, high, duration):
+        if self.controller:
+            self.controller.rumble(low, high, duration)
+
+    def steer(self, direction):
+        """Поворот змейки с учетом реверса управления от гриба"""
+        if self.recorder is not None:
+            self.recorder.steer(self.tick_count, direction)
+        if self.effect_left('reverse'):
+            direction = (-direction[0], -direction[1])
+        self.snake.set_direction(direction)
+
+    def tick(self, base_move_interval=10):
+        """Один тик симуляции (1/60 с): скорость, движение змейки и update()"""
+        self.moved = False
+        if self.game_over:
+            return
+        if self.recorder is not None:
+            self.recorder.set_speed(self.tick_count, base_move_interval)
+        self.tick_count += 1
+
+        # Применяем эффекты ускорения/замедления от бонусов и дебафов
+        # (timers.now здесь еще номер прошлого тика - эффекты проверяются до update())
+        move_interval = base_move_interval
+        if self.effect_left('boost'):  # Ускорение от яблока
+            move_interval = max(2, base_move_interval - 5)  # Ускоряем на 5 кадров
+        elif self.effect_left('slowdown'):  # Замедление от паука
+            move_interval = min(20, base_move_interval + 5)  # Замедляем на 5 кадров
+
+        self.move_counter += 1
+        if self.move_counter >= move_interval:
+            # Не двигаемся, если активна заморозка
+            if not self.effect_left('freeze'):
+                self.snake.move()
+                self.moved = True
+            self.move_counter = 0
+
+        self.update()
+
+    def update(self):
+        if self.game_over:
+            return
+
+        # Наступивший тик: переспавн предметов, у которых истекло время (и еды, ждущей
+        # свободную клетку); эффекты заканчиваются сами по effect_until
+        self.timers.advance()
+
+        # Обёртывание через края (до 5 уровня) или стены по периметру (после 5 уровня)
+        head_x, head_y = self.snake.body[0]
+        grid_width = self.grid_width
+        grid_height = self.grid_height
+
+        if self.level > 5:
+            if head_x < 0 or head_x >= grid_width or head_y < 0 or head_y >= grid_height:
+                self.game_over = True
+                self._rumble(1.0, 1.0, 500)
+                return
+        else:
+            wrapped = (head_x % grid_width, head_y % grid_height)
+            if wrapped != self.snake.body[0]:
+                self.snake.set_head(wrapped)
+
+        # Проверка столкновения с собой (если нет неуязвимости)
+        invincible = self.effect_left('invincible')
+        if not invincible:
+            if self.snake.hits_itself():
+                self.game_over = True
+                return
+
+        # Проверка столкновения с препятствиями 2х2 (если нет неуязвимости)
+        if not invincible:
+            if self.obstacles.check_collision(self.snake.body[0]):
+                self.game_over = True
+                self._rumble(1.0, 1.0, 500)
+                return
+
+        # Подбор предмета: в клетке не больше одного предмета, ищем его по хешу
+        item = self.items.at(self.snake.body[0])
+        if item is not None:
+            self.pick_up(item)
+
+    def pick_up(self, item):
+        """Применяет предмет по его описанию в ITEM_TYPES"""
+        kind = item.kind
+        if kind.growth > 0:
+            self.snake.grow()
+        elif kind.growth < 0 and len(self.snake.body) > 3:
+            # Укорачиваем змею на 1 сегмент (если больше 3 сегментов)
+            self.snake.shrink()
+        points = item.points
+        if kind.multiply and self.last_pickup_was_bonus:
+            points *= 1 + self.combo_counter
+        self.score = max(0, self.score + points)
+        if kind.effect is not None:
+            self.start_effect(*kind.effect)
+        item.spawn()
+        if kind.combo:
+            # Бонусы подряд увеличивают множитель очков
+            if self.last_pickup_was_bonus:
+                self.combo_counter += 1
+            else:
+                self.combo_counter = 1
+            self.last_pickup_was_bonus = True
+        else:
+            self.last_pickup_was_bonus = False
+            self.combo_counter = 0
+        if kind.rumble is not None:
+            self._rumble(*kind.rumble)
+        if kind.level_up:
+            self.check_level_up()
+
+    def check_level_up(self):
+        """Проверка повышения уровня каждые 250 очков"""
+        new_level = (self.score // 250) + 1
+        if new_level > self.level:
+            self.level = new_level
+            # Добавляем новые препятствия каждый уровень
+            self.obstacles.count = min(5 + self.level, max_obstacles(self.grid_width, self.grid_height))
+            # С 6 уровня края поля - стены, камни проверяются уже без сквозного прохода
+            self.obstacles.generate_obstacles(self.snake, wrap=self.level <= 5)
+            self._rumble(1.0, 1.0, 600)
@@ -1,110 +1,157 @@
+import time
+_STARTED = time.perf_counter()  # До импорта pygame: импорты тоже входят во время запуска
 import pygame 
 import sys
-import json
 import os
-from game_types.index import Snake, Food, Game
+import argparse
+from game_types.index import Game
+from game_types.assets import textures, texts
+from game_types.clock import FixedStepClock
+from game_types.highscores import HighscoreStore, atomic_write
+from game_types.replay import Replay, ReplayError, ReplayPlayer, verify
+from game_types.profiler import FrameProfiler, StartupTimer, open_sink
 
-def load_highscores():
-    """Загружает таблицу рекордов из файла"""
-    highscore_file = os.path.join(os.path.dirname(__file__), 'highscores.json')
-    try:
-        if os.path.exists(highscore_file):
-            with open(highscore_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                print(f"📖 Загружено {len(data)} рекордов из файла")
-                return data
-        else:
-            print(f"⚠️ Файл рекордов не найден: {highscore_file}")
-            return []
-    except Exception as e:
-        print(f"❌ Ошибка загрузки рекордов: {e}")
-        return []
+REPLAYS_DIR = os.path.join(os.path.dirname(__file__), 'replays')
+# Вся история рекордов; файл читается один раз при первом обращении,
+# а запись идет в фоновом потоке и дописывается перед выходом из игры
+highscores = HighscoreStore(os.path.join(os.path.dirname(__file__), 'highscores.json'))
 
-def save_highscores(highscores):
-    """Сохраняет таблицу рекордов в файл"""
-    highscore_file = os.path.join(os.path.dirname(__file__), 'highscores.json')
-    try:
-        with open(highscore_file, 'w', encoding='utf-8') as f:
-            json.dump(highscores, f, indent=2, ensure_ascii=False)
-        print(f"✅ Таблица рекордов сохранена в {highscore_file}")
-    except Exception as e:
-        print(f"❌ Ошибка сохранения: {e}")
+BOARD = (48, 27)  # Поле в клетках; окно = BOARD * размер клетки
+LAYOUT_WIDTH = 1920  # Координаты меню ниже заданы для окна 1920x1080 (клетка 40 px)
+
+def ui(screen, value):
+    """Размер из раскладки 1920x1080 -> пиксели экрана (при --cell 20 экран вдвое меньше)"""
+    return max(1, round(value * screen.get_width() / LAYOUT_WIDTH))
 
-def add_highscore(score, level, name="Player"):
-    """Добавляет новый рекорд в таблицу"""
-    highscores = load_highscores()
+def _write_replay(filename, data):
+    os.makedirs(REPLAYS_DIR, exist_ok=True)
+    atomic_write(os.path.join(REPLAYS_DIR, filename), data)
+    print(f"🎬 Повтор сохранен: {filename}")
+
+def save_replay(replay):
+    """Сохраняет повтор партии в папку replays (в фоне), возвращает имя файла"""
     from datetime import datetime
-    highscores.append({
-        'name': name,
-        'score': score,
-        'level': level,
-        'date': datetime.now().strftime('%Y-%m-%d %H:%M')
-    })
-    # Сортируем по убыванию очков и оставляем топ-10
-    highscores = sorted(highscores, key=lambda x: x['score'], reverse=True)[:10]
-    save_highscores(highscores)
-    print(f"💾 Рекорд сохранен: {name} - {score} очков (уровень {level})")
-    return highscores
+    filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{replay.score}.snkr"
+    highscores.writer.submit(_write_replay, filename, replay.to_bytes())
+    return filename
+
+def add_highscore(score, level, name="Player", replay=None):
+    """Добавляет новый рекорд в таблицу (с повтором партии, если он есть)"""
+    extra = {}
+    if replay is not None:
+        extra['replay'] = save_replay(replay)
+    rank = highscores.add(score, level, name, **extra)
+    print(f"💾 Рекорд сохранен: {name} - {score} очков (уровень {level}), место {rank}")
+    return rank
+
+# Экраны меню не рисуются каждый кадр: они спят в pygame.event.wait() до события
+# и перерисовываются, только когда что-то изменилось (или окно нужно восстановить)
+REDRAW_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED)
+
+def wait_events(timeout=None):
+    """Ждет хотя бы одно событие (или timeout мс), не нагружая процессор; возвращает все накопившиеся"""
+    event = pygame.event.wait(timeout) if timeout else pygame.event.wait()
+    if event.type == pygame.NOEVENT:
+        return []
+    return [event] + pygame.event.get()
+
+class StickRepeat:
+    """Листание стиком: шаг сразу при отклонении, затем повтор каждые interval мс, пока стик удерживается"""
+    def __init__(self, delay=200, interval=200, threshold=0.5):
+        self.delay = delay
+        self.interval = interval
+        self.threshold = threshold
+        self.direction = 0
+        self.next_time = None
+
+    def motion(self, value):
+        """Новое положение оси; возвращает шаг (-1, 0, 1), который нужно сделать сейчас"""
+        direction = -1 if value < -self.threshold else 1 if value > self.threshold else 0
+        if direction == self.direction:
+            return 0  # Дрожание стика в том же положении - не шаг
+        self.direction = direction
+        self.next_time = pygame.time.get_ticks() + self.delay if direction else None
+        return direction
+
+    def poll(self):
+        """Шаг автоповтора, если подошло его время"""
+        if self.direction and pygame.time.get_ticks() >= self.next_time:
+            self.next_time = pygame.time.get_ticks() + self.interval
+            return self.direction
+        return 0
+
+    def timeout(self):
+        """Сколько мс можно ждать событий до следующего автоповтора (None - сколько угодно)"""
+        if not self.direction:
+            return None
+        return max(1, self.next_time - pygame.time.get_ticks())
+
+def draw_name_input(screen, score, level, player_name, max_name_length):
+    """Рисует экран ввода имени"""
+    font = texts.font(ui(screen, 64))
+    medium_font = texts.font(ui(screen, 48))
+    small_font = texts.font(ui(screen, 36))
+    screen.fill((20, 20, 40))
+    
+    # Заголовок
+    title = texts.render(font, "🎮 НОВЫЙ РЕКОРД! 🎮", (255, 215, 0))
+    screen.blit(title, (screen.get_width() // 2 - title.get_width() // 2, ui(screen, 80)))
+    
+    # Информация о рекорде
+    score_text = texts.render(medium_font, f"Счет: {score}", (255, 255, 255))
+    level_text = texts.render(medium_font, f"Уровень: {level}", (255, 255, 255))
+    screen.blit(score_text, (screen.get_width() // 2 - score_text.get_width() // 2, ui(screen, 200)))
+    screen.blit(level_text, (screen.get_width() // 2 - level_text.get_width() // 2, ui(screen, 280)))
+    
+    # Ввод имени
+    input_label = texts.render(medium_font, "Введите ваше имя:", (200, 200, 200))
+    screen.blit(input_label, (screen.get_width() // 2 - input_label.get_width() // 2, ui(screen, 400)))
+    
+    # Поле ввода
+    input_box_width = ui(screen, 500)
+    input_box_height = ui(screen, 60)
+    input_box_x = screen.get_width() // 2 - input_box_width // 2
+    input_box_y = ui(screen, 500)
+    pygame.draw.rect(screen, (100, 100, 100), (input_box_x, input_box_y, input_box_width, input_box_height), 2)
+    
+    # Текст в поле
+    name_display = player_name + ("_" if len(player_name) < max_name_length else "")
+    name_text = texts.render(medium_font, name_display, (255, 255, 255))
+    screen.blit(name_text, (input_box_x + ui(screen, 20), input_box_y + ui(screen, 10)))
+    
+    # Подсказка
+    hint = texts.render(small_font, "Enter для сохранения | Backspace для удаления | ESC для отмены", (150, 150, 150))
+    screen.blit(hint, (screen.get_width() // 2 - hint.get_width() // 2, screen.get_height() - ui(screen, 100)))
+    
+    pygame.display.flip()
 
-def input_player_name(screen, score, level, controller=None):
+def input_player_name(screen, score, level, controller=None, replay=None):
     """Экран ввода имени игрока для сохранения рекорда"""
     print(f"\n🎮 Открываю экран ввода имени для рекорда {score}...")
-    font = pygame.font.Font(None, 64)
-    medium_font = pygame.font.Font(None, 48)
-    small_font = pygame.font.Font(None, 36)
-    
     player_name = ""
     max_name_length = 15
-    clock = pygame.time.Clock()
+    redraw = True
     
     while True:
-        screen.fill((20, 20, 40))
-        
-        # Заголовок
-        title = font.render("🎮 НОВЫЙ РЕКОРД! 🎮", True, (255, 215, 0))
-        screen.blit(title, (screen.get_width() // 2 - title.get_width() // 2, 80))
-        
-        # Информация о рекорде
-        score_text = medium_font.render(f"Счет: {score}", True, (255, 255, 255))
-        level_text = medium_font.render(f"Уровень: {level}", True, (255, 255, 255))
-        screen.blit(score_text, (screen.get_width() // 2 - score_text.get_width() // 2, 200))
-        screen.blit(level_text, (screen.get_width() // 2 - level_text.get_width() // 2, 280))
-        
-        # Ввод имени
-        input_label = medium_font.render("Введите ваше имя:", True, (200, 200, 200))
-        screen.blit(input_label, (screen.get_width() // 2 - input_label.get_width() // 2, 400))
-        
-        # Поле ввода
-        input_box_width = 500
-        input_box_height = 60
-        input_box_x = screen.get_width() // 2 - input_box_width // 2
-        input_box_y = 500
-        pygame.draw.rect(screen, (100, 100, 100), (input_box_x, input_box_y, input_box_width, input_box_height), 2)
-        
-        # Текст в поле
-        name_display = player_name + ("_" if len(player_name) < max_name_length else "")
-        name_text = medium_font.render(name_display, True, (255, 255, 255))
-        screen.blit(name_text, (input_box_x + 20, input_box_y + 10))
+        if redraw:
+            draw_name_input(screen, score, level, player_name, max_name_length)
+            redraw = False
         
-        # Подсказка
-        hint = small_font.render("Enter для сохранения | Backspace для удаления | ESC для отмены", True, (150, 150, 150))
-        screen.blit(hint, (screen.get_width() // 2 - hint.get_width() // 2, screen.get_height() - 100))
-        
-        pygame.display.flip()
-        clock.tick(60)
-        
-        for event in pygame.event.get():
+        for event in wait_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
+            if event.type in REDRAW_EVENTS:
+                redraw = True
             
             if event.type == pygame.KEYDOWN:
+                redraw = True
                 if event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
                     # Сохраняем рекорд
                     if len(player_name) == 0:
                         player_name = "Player"
                     print(f"✅ Сохраняю имя: {player_name}")
-                    add_highscore(score, level, player_name)
+                    add_highscore(score, level, player_name, replay)
                     return
                 elif event.key == pygame.K_BACKSPACE:
                     player_name = player_name[:-1]
@@ -119,57 +166,61 @@ def input_player_name(screen, score, level, controller=None):
                 if event.button == 0:  # Cross/A - подтвердить
                     if len(player_name) == 0:
                         player_name = "Player"
-                    add_highscore(score, level, player_name)
+                    add_highscore(score, level, player_name, replay)
                     return
                 elif event.button == 1:  # Circle/B - отмена
                     return
 
 def show_highscores(screen, controller=None):
     """Показывает таблицу рекордов"""
-    font = pygame.font.Font(None, 64)
-    medium_font = pygame.font.Font(None, 42)
-    small_font = pygame.font.Font(None, 32)
-    highscores = load_highscores()
+    font = texts.font(ui(screen, 64))
+    medium_font = texts.font(ui(screen, 42))
+    small_font = texts.font(ui(screen, 32))
+    top = highscores.top(10)
     
-    running = True
-    while running:
-        screen.fill((20, 20, 40))
+    redraw = True
+    while True:
+        if redraw:
+            screen.fill((20, 20, 40))
         
-        # Заголовок
-        title = font.render("🏆 ТАБЛИЦА РЕКОРДОВ 🏆", True, (255, 215, 0))
-        screen.blit(title, (screen.get_width() // 2 - title.get_width() // 2, 80))
+            # Заголовок
+            title = texts.render(font, "🏆 ТАБЛИЦА РЕКОРДОВ 🏆", (255, 215, 0))
+            screen.blit(title, (screen.get_width() // 2 - title.get_width() // 2, ui(screen, 80)))
         
-        # Таблица рекордов
-        if highscores:
-            y_pos = 200
-            for i, record in enumerate(highscores):
-                rank_color = (255, 215, 0) if i == 0 else (192, 192, 192) if i == 1 else (205, 127, 50) if i == 2 else (255, 255, 255)
-                rank_text = medium_font.render(f"{i+1}.", True, rank_color)
-                name_text = medium_font.render(record.get('name', 'Player'), True, rank_color)
-                score_text = medium_font.render(f"{record['score']} очков", True, rank_color)
-                level_text = small_font.render(f"Ур.{record['level']}", True, (150, 150, 150))
-                date_text = small_font.render(f"{record['date']}", True, (120, 120, 120))
+            # Таблица рекордов
+            if top:
+                y_pos = ui(screen, 200)
+                for i, record in enumerate(top):
+                    rank_color = (255, 215, 0) if i == 0 else (192, 192, 192) if i == 1 else (205, 127, 50) if i == 2 else (255, 255, 255)
+                    rank_text = texts.render(medium_font, f"{i+1}.", rank_color)
+                    name_text = texts.render(medium_font, record.get('name', 'Player'), rank_color)
+                    score_text = texts.render(medium_font, f"{record['score']} очков", rank_color)
+                    level_text = texts.render(small_font, f"Ур.{record['level']}", (150, 150, 150))
+                    date_text = texts.render(small_font, f"{record['date']}", (120, 120, 120))
                 
-                screen.blit(rank_text, (300, y_pos))
-                screen.blit(name_text, (380, y_pos))
-                screen.blit(score_text, (600, y_pos))
-                screen.blit(level_text, (850, y_pos))
-                screen.blit(date_text, (1000, y_pos))
-                y_pos += 65
-        else:
-            no_records = medium_font.render("Рекордов пока нет", True, (150, 150, 150))
-            screen.blit(no_records, (screen.get_width() // 2 - no_records.get_width() // 2, 300))
+                    screen.blit(rank_text, (ui(screen, 300), y_pos))
+                    screen.blit(name_text, (ui(screen, 380), y_pos))
+                    screen.blit(score_text, (ui(screen, 600), y_pos))
+                    screen.blit(level_text, (ui(screen, 850), y_pos))
+                    screen.blit(date_text, (ui(screen, 1000), y_pos))
+                    y_pos += ui(screen, 65)
+            else:
+                no_records = texts.render(medium_font, "Рекордов пока нет", (150, 150, 150))
+                screen.blit(no_records, (screen.get_width() // 2 - no_records.get_width() // 2, ui(screen, 300)))
         
-        # Подсказка
-        hint = small_font.render("Нажмите ESC или Start для выхода", True, (200, 200, 200))
-        screen.blit(hint, (screen.get_width() // 2 - hint.get_width() // 2, screen.get_height() - 100))
+            # Подсказка
+            hint = texts.render(small_font, "Нажмите ESC или Start для выхода", (200, 200, 200))
+            screen.blit(hint, (screen.get_width() // 2 - hint.get_width() // 2, screen.get_height() - ui(screen, 100)))
         
-        pygame.display.flip()
+            pygame.display.flip()
+            redraw = False
         
-        for event in pygame.event.get():
+        for event in wait_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
+            if event.type in REDRAW_EVENTS:
+                redraw = True
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     return
@@ -181,30 +232,35 @@ def show_highscores(screen, controller=None):
 
 def show_menu(screen, controller=None):
     """Меню с выбором Resume/Highscores/Exit. Возвращает действие."""
-    font = pygame.font.Font(None, 74)
-    small_font = pygame.font.Font(None, 48)
+    font = texts.font(ui(screen, 74))
+    small_font = texts.font(ui(screen, 48))
     options = ["Resume", "Highscores", "Exit"]
     selected = 0
-    running = True
-    clock = pygame.time.Clock()
+    stick = StickRepeat()
+    redraw = True
     
-    while running:
-        screen.fill((0, 0, 0))
-        title = font.render("Меню", True, (255, 255, 255))
-        screen.blit(title, (screen.get_width() // 2 - title.get_width() // 2, screen.get_height() // 2 - 180))
+    while True:
+        if redraw:
+            screen.fill((0, 0, 0))
+            title = texts.render(font, "Меню", (255, 255, 255))
+            screen.blit(title, (screen.get_width() // 2 - title.get_width() // 2, screen.get_height() // 2 - ui(screen, 180)))
         
-        for i, opt in enumerate(options):
-            color = (255, 255, 0) if i == selected else (255, 255, 255)
-            text = small_font.render(opt, True, color)
-            screen.blit(text, (screen.get_width() // 2 - text.get_width() // 2, screen.get_height() // 2 - 60 + i * 60))
+            for i, opt in enumerate(options):
+                color = (255, 255, 0) if i == selected else (255, 255, 255)
+                text = texts.render(small_font, opt, color)
+                screen.blit(text, (screen.get_width() // 2 - text.get_width() // 2, screen.get_height() // 2 + (i - 1) * ui(screen, 60)))
         
-        pygame.display.flip()
-        clock.tick(60)
+            pygame.display.flip()
+            redraw = False
         
-        for event in pygame.event.get():
+        previous = selected
+        # Спим до события или до следующего автоповтора удерживаемого стика
+        for event in wait_events(stick.timeout()):
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
+            if event.type in REDRAW_EVENTS:
+                redraw = True
             
             # Клавиатура
             if event.type == pygame.KEYDOWN:
@@ -217,6 +273,7 @@ def show_menu(screen, controller=None):
                         return "resume"
                     elif options[selected] == "Highscores":
                         show_highscores(screen, controller)
+                        redraw = True
                     elif options[selected] == "Exit":
                         return "exit"
                 elif event.key == pygame.K_ESCAPE:
@@ -233,6 +290,7 @@ def show_menu(screen, controller=None):
                         return "resume"
                     elif options[selected] == "Highscores":
                         show_highscores(screen, controller)
+                        redraw = True
                     elif options[selected] == "Exit":
                         return "exit"
                 elif event.button == 9:  # Start - выход из меню
@@ -240,17 +298,104 @@ def show_menu(screen, controller=None):
                 elif event.button == 1:  # Circle/B - выход из меню
                     return "resume"
             
-            # Геймпад Left Stick
+            # Геймпад Left Stick (без задержки цикла: повтор по таймеру в StickRepeat)
             if event.type == pygame.JOYAXISMOTION and controller:
                 if event.axis == 1:  # Left stick Y
-                    if event.value < -0.5:
-                        selected = (selected - 1) % len(options)
-                        pygame.time.delay(200)  # Задержка чтобы не листать слишком быстро
-                    elif event.value > 0.5:
-                        selected = (selected + 1) % len(options)
-                        pygame.time.delay(200)
+                    selected = (selected + stick.motion(event.value)) % len(options)
+        
+        selected = (selected + stick.poll()) % len(options)
+        if selected != previous:
+            redraw = True
 
-def main():
+def watch_replay(screen, replay, fps=60):
+    """Проигрывает повтор с отрисовкой в реальном времени (1x). ESC - выход"""
+    game = Game(screen.get_width(), screen.get_height(), seed=replay.seed,
+                grid_size=screen.get_width() // BOARD[0])
+    player = ReplayPlayer(replay)
+    clock = pygame.time.Clock()
+    sim_clock = FixedStepClock()
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                return
+            if event.type == pygame.JOYBUTTONDOWN and event.button in (1, 9):
+                return
+        for _ in range(sim_clock.steps()):
+            if not player.finished(game):
+                game.tick(player.apply(game))
+        game.draw(screen, sim_clock.alpha)
+        pygame.display.flip()
+        clock.tick(fps)
+
+def verify_replay(path):
+    """Пересчитывает повтор без окна и сверяет результат с записанным"""
+    try:
+        replay = Replay.load(path)
+    except (OSError, ReplayError) as e:
+        print(f"❌ Не удалось прочитать повтор: {e}")
+        return False
+    if verify(replay):
+        print(f"✅ Повтор подтвержден: {replay.score} очков, уровень {replay.level}, {replay.ticks} тиков")
+        return True
+    print(f"❌ Повтор не совпадает с записанным результатом ({replay.score} очков)")
+    return False
+
+def draw_splash(screen):
+    """Заставка на время загрузки: рисуется до текстур и фона, одним шрифтом по умолчанию"""
+    screen.fill((20, 20, 20))
+    center_x = screen.get_width() // 2
+    center_y = screen.get_height() // 2
+    title = texts.render(texts.font(ui(screen, 96)), "Snake Game", (0, 200, 0))
+    screen.blit(title, title.get_rect(center=(center_x, center_y - ui(screen, 40))))
+    hint = texts.render(texts.font(ui(screen, 36)), "Загрузка...", (200, 200, 200))
+    screen.blit(hint, hint.get_rect(center=(center_x, center_y + ui(screen, 40))))
+    pygame.display.flip()
+    pygame.event.pump()  # Иначе оконный менеджер может считать окно зависшим
+
+def parse_args(argv=None):
+    """Параметры запуска"""
+    parser = argparse.ArgumentParser(description='Snake Game')
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help='обновлять на экране только изменившиеся клетки (для слабых машин)')
+    parser.add_argument('--fps', type=int, default=60,
+                        help='ограничение частоты кадров (0 - без ограничения); скорость игры от него не зависит')
+    parser.add_argument('--replay', metavar='FILE',
+                        help='посмотреть записанную партию (.snkr)')
+    parser.add_argument('--verify', metavar='FILE',
+                        help='пересчитать партию без окна и проверить ее результат')
+    parser.add_argument('--cell', type=int, choices=(40, 20, 10), default=40,
+                        help='размер клетки в пикселях: меньше 40 - поле рисуется в маленькое окно, '
+                             'которое SDL растягивает на экран (pygame.SCALED)')
+    parser.add_argument('--filter', choices=('nearest', 'linear'), default='nearest',
+                        help='фильтрация при растягивании (--cell 20/10): четкие пиксели или сглаживание')
+    parser.add_argument('--profile', action='store_true',
+                        help='сразу показать оверлей с временем подсистем (переключается F3)')
+    parser.add_argument('--profile-log', metavar='FILE',
+                        help='писать время каждого кадра по подсистемам в FILE (.csv или .jsonl)')
+    return parser.parse_args(argv)
+
+def open_window(cell, filtering='nearest'):
+    """Окно под поле BOARD с клеткой cell px. Меньше 40 px: рисуем в логическую поверхность
+    48*cell x 27*cell, а до размера экрана ее растягивает SDL (на видеокарте, с рамками по краям)"""
+    size = (BOARD[0] * cell, BOARD[1] * cell)
+    if cell >= 40:
+        return pygame.display.set_mode(size)  # Full HD 1:1, как раньше
+    # Подсказку SDL читает при создании рендерера для SCALED, поэтому ставим ее до set_mode
+    os.environ['SDL_RENDER_SCALE_QUALITY'] = filtering
+    return pygame.display.set_mode(size, pygame.SCALED)
+
+def main(args=None):
+    if args is None:
+        args = parse_args()
+    if args.verify:
+        # Проверка рекорда не требует окна: правила считаются в GameState на максимальной скорости
+        sys.exit(0 if verify_replay(args.verify) else 1)
+    startup = StartupTimer(_STARTED)
+    startup.stage('импорт')
+    # PNG читаются и декодируются в фоне, пока поднимается SDL и открывается окно
+    textures.preload()
     pygame.init()
     
     # Инициализация джойстика
@@ -262,95 +407,111 @@ def main():
         controller.init()
         print(f"Контроллер подключен: {controller.get_name()}")
     
-    # Full HD окно
-    screen_width = 1920
-    screen_height = 1080
-    screen = pygame.display.set_mode((screen_width, screen_height))
+    startup.stage('pygame.init')
+    # Full HD окно (или поменьше, растянутое SDL, при --cell 20/10)
+    screen = open_window(args.cell, args.filter)
+    screen_width, screen_height = screen.get_size()
     pygame.display.set_caption('Snake Game')
+    startup.stage('окно')
+    draw_splash(screen)
+    startup.stage('заставка')
+
+    if args.replay:
+        try:
+            replay = Replay.load(args.replay)
+        except (OSError, ReplayError) as e:
+            print(f"❌ Не удалось прочитать повтор: {e}")
+            pygame.quit()
+            sys.exit(1)
+        watch_replay(screen, replay, args.fps)
+        pygame.quit()
+        return
 
-    # Initialize game objects
-    game = Game(screen_width, screen_height)
+    highscores.preload()
+    textures.wait()
+    startup.stage('текстуры')
+
+    # Initialize game objects (с записью повтора партии)
+    game = Game(screen_width, screen_height, record=True, grid_size=args.cell)
     game.set_controller(controller)
+    startup.stage('игра')
     
     clock = pygame.time.Clock()
+    sim_clock = FixedStepClock()  # Симуляция всегда 60 тиков в секунду, независимо от FPS
+    # Замеры идут всегда (это несколько вызовов perf_counter за кадр), F3 их показывает
+    profiler = FrameProfiler(args.fps, sink=open_sink(args.profile_log) if args.profile_log else None)
+    profiler.overlay_visible = args.profile
+    profiler.font_size = ui(screen, profiler.font_size)
+    game.profiler = profiler
+    last_overlay = None
     game_running = True
-    move_counter = 0  # Счётчик для регулировки скорости движения
-    move_interval = 10  # Как часто вызывать move() (в кадрах)
     
     while game_running:
-        # Обработка событий
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            # Обработка клавиатуры и контроллера
-            handle_input = getattr(game, "handle_input", None)
-            if handle_input:
-                handle_input(event)
-            # Обработка нажатия клавиши ESC для открытия меню
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    action = show_menu(screen, controller)
-                    if action == "exit":
-                        pygame.quit()
-                        sys.exit()
-            
-            # Обработка кнопки Start на DualSense для открытия меню
-            if event.type == pygame.JOYBUTTONDOWN and controller:
-                print(f"🎮 Нажата кнопка: {event.button}")  # Отладка
-                if event.button == 6:  # Кнопка Start (три палочки)
-                    print("📋 Открываю меню...")
-                    action = show_menu(screen, controller)
-                    if action == "exit":
-                        pygame.quit()
-                        sys.exit()
-                # D-Pad и навигация
-                elif event.button == 11:  # D-Pad Up
-                    direction = (0, -1)
-                    if game.reverse_control_timer > 0:
-                        direction = (-direction[0], -direction[1])
-                    game.snake.set_direction(direction)
-                elif event.button == 12:  # D-Pad Down
-                    direction = (0, 1)
-                    if game.reverse_control_timer > 0:
-                        direction = (-direction[0], -direction[1])
-                    game.snake.set_direction(direction)
-                elif event.button == 13:  # D-Pad Left
-                    direction = (-1, 0)
-                    if game.reverse_control_timer > 0:
-                        direction = (-direction[0], -direction[1])
-                    game.snake.set_direction(direction)
-                elif event.button == 14:  # D-Pad Right
-                    direction = (1, 0)
-                    if game.reverse_control_timer > 0:
-                        direction = (-direction[0], -direction[1])
-                    game.snake.set_direction(direction)
-            
-            # Обработка левого стика для смены направления
-            if event.type == pygame.JOYAXISMOTION and controller:
-                if event.axis == 0:  # Left stick X
-                    direction = None
-                    if event.value > 0.5:
-                        direction = (1, 0)  # Right
-                    elif event.value < -0.5:
-                        direction = (-1, 0)  # Left
-                    # Применяем реверс управления от гриба
-                    if direction and game.reverse_control_timer > 0:
-                        direction = (-direction[0], -direction[1])
-                    if direction:
-                        game.snake.set_direction(direction)
-                elif event.axis == 1:  # Left stick Y
-                    direction = None
-                    if event.value > 0.5:
-                        direction = (0, 1)  # Down
-                    elif event.value < -0.5:
-                        direction = (0, -1)  # Up
-                    # Применяем реверс управления от гриба
-                    if direction and game.reverse_control_timer > 0:
-                        direction = (-direction[0], -direction[1])
-                    if direction:
-                        game.snake.set_direction(direction)
-        
+        profiler.begin_frame()
+        events = pygame.event.get()
+        with profiler.section('events'):
+            for event in events:
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    profiler.toggle_overlay()
+                # Обработка клавиатуры и контроллера
+                handle_input = getattr(game, "handle_input", None)
+                if handle_input:
+                    handle_input(event)
+                # Обработка нажатия клавиши ESC для открытия меню
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        action = show_menu(screen, controller)
+                        if action == "exit":
+                            pygame.quit()
+                            sys.exit()
+                        game.invalidate_screen()
+                        sim_clock.reset()
+                        profiler.skip_frame()
+
+                # Обработка кнопки Start на DualSense для открытия меню
+                if event.type == pygame.JOYBUTTONDOWN and controller:
+                    if event.button == 6:  # Кнопка Start (три палочки)
+                        action = show_menu(screen, controller)
+                        if action == "exit":
+                            pygame.quit()
+                            sys.exit()
+                        game.invalidate_screen()
+                        sim_clock.reset()
+                        profiler.skip_frame()
+                    # D-Pad и навигация
+                    elif event.button == 11:  # D-Pad Up
+                        game.steer((0, -1))
+                    elif event.button == 12:  # D-Pad Down
+                        game.steer((0, 1))
+                    elif event.button == 13:  # D-Pad Left
+                        game.steer((-1, 0))
+                    elif event.button == 14:  # D-Pad Right
+                        game.steer((1, 0))
+
+                # Обработка левого стика для смены направления
+                if event.type == pygame.JOYAXISMOTION and controller:
+                    if event.axis == 0:  # Left stick X
+                        direction = None
+                        if event.value > 0.5:
+                            direction = (1, 0)  # Right
+                        elif event.value < -0.5:
+                            direction = (-1, 0)  # Left
+                        # Реверс управления от гриба применяется в steer()
+                        if direction:
+                            game.steer(direction)
+                    elif event.axis == 1:  # Left stick Y
+                        direction = None
+                        if event.value > 0.5:
+                            direction = (0, 1)  # Down
+                        elif event.value < -0.5:
+                            direction = (0, -1)  # Up
+                        # Реверс управления от гриба применяется в steer()
+                        if direction:
+                            game.steer(direction)
+
         # Обработка триггера R2 для управления движением (ВМУНЕ цикла событий!)
         base_move_interval = 10
         if controller:
@@ -362,34 +523,39 @@ def main():
             else:
                 base_move_interval = 10
         
-        # Применяем эффекты ускорения/замедления от бонусов и дебафов
-        move_interval = base_move_interval
-        if game.slowdown_timer < 0:  # Ускорение от яблока
-            move_interval = max(2, base_move_interval - 5)  # Ускоряем на 5 кадров
-            game.slowdown_timer += 1  # Уменьшаем таймер (движется к 0)
-        elif game.slowdown_timer > 0:  # Замедление от паука
-            move_interval = min(20, base_move_interval + 5)  # Замедляем на 5 кадров
-            game.slowdown_timer -= 1  # Уменьшаем таймер
-        
-        # Счётчик движения (ВМЕЖЕ цикла событий)
-        move_counter += 1
-        if move_counter >= move_interval:
-            # Не двигаемся, если активна заморозка
-            if game.freeze_timer == 0:
-                game.snake.move()
-            move_counter = 0
-        
-        # Обновление игры и отрисовка
-        game.update()
-        draw = getattr(game, "draw", None)
-        if draw:
-            draw(screen)
-        
-        pygame.display.flip()
+        # Движение, эффекты ускорения/замедления и правила игры - в GameState.tick().
+        # Тиков столько, сколько прошло реального времени: медленный кадр не замедляет игру
+        with profiler.section('update'):
+            for _ in range(sim_clock.steps()):
+                game.tick(base_move_interval)
+        if args.dirty_rects:
+            # Только изменившиеся клетки и HUD (без интерполяции - клетки целиком)
+            with profiler.section('draw'):
+                rects = game.draw_dirty(screen)
+            # Оверлей непрозрачный: повторный вывод поверх себя же ничего не портит,
+            # а если он сменил размер - следующий кадр перерисуется целиком
+            overlay = profiler.draw_overlay(screen)
+            if overlay:
+                rects.append(overlay)
+            if overlay != last_overlay:
+                game.invalidate_screen()
+            last_overlay = overlay
+            with profiler.section('flip'):
+                pygame.display.update(rects)
+        else:
+            game.draw(screen, sim_clock.alpha)
+            profiler.draw_overlay(screen)
+            with profiler.section('flip'):
+                pygame.display.flip()
+        if startup is not None:
+            startup.stage('первый кадр')
+            print(startup.report())
+            startup = None
         
         # Если игра закончилась, просим ввести имя и сохранить рекорд
         if game.game_over and not game._score_saved:
-            input_player_name(screen, game.score, game.level, controller)
+            replay = game.recorder.finish(game)
+            input_player_name(screen, game.score, game.level, controller, replay)
             game._score_saved = True
             # После сохранения рекорда, показываем меню
             action = show_menu(screen, controller)
@@ -398,9 +564,10 @@ def main():
                 sys.exit()
             # Иначе перезагружаем игру
             game_running = False
+            profiler.skip_frame()
         
-        # Постоянные 60 FPS для плавности отрисовки
-        clock.tick(60)
+        # Частота отрисовки (по умолчанию 60 FPS); 0 - без ограничения
+        clock.tick(args.fps)
 
 if __name__ == "__main__":
     main()